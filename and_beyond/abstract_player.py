@@ -15,6 +15,7 @@ if TYPE_CHECKING:
 
 
 class InventoryItem:
+    __slots__ = ('item', 'count')
     item: Block
     count: int
 
@@ -1,5 +1,7 @@
 from typing import TYPE_CHECKING, Optional
 
+import numpy as np
+import numpy.typing as npt
 from typing_extensions import Self
 
 if TYPE_CHECKING:
@@ -7,6 +9,14 @@ if TYPE_CHECKING:
 
 BLOCKS: list[Optional['Block']] = [None] * 256
 
+# Block properties indexed by block ID, for looking up lots of blocks at once (e.g. SOLID_BLOCKS[chunk.get_tile_ids()]).
+# These are kept up to date by Block. IDs that aren't registered behave like air, just like in get_block_by_id.
+SOLID_BLOCKS: npt.NDArray[np.bool_] = np.zeros(256, np.bool_) # Whether the block has a bounding box
+FULL_CUBE_BLOCKS: npt.NDArray[np.bool_] = np.zeros(256, np.bool_) # Whether the bounding box is the whole block
+BLOCK_LUMINESCENCE: npt.NDArray[np.uint8] = np.zeros(256, np.uint8)
+BLOCK_OPACITY: npt.NDArray[np.uint8] = np.ones(256, np.uint8)
+RANDOM_TICK_BLOCKS: npt.NDArray[np.bool_] = np.zeros(256, np.bool_)
+
 
 def get_block_by_id(id: int) -> 'Block':
     block = BLOCKS[id]
@@ -22,6 +32,8 @@ class Block:
     turnable_texture: bool = False
     texture_path: Optional[str]
     luminescence: int = 0
+    opacity: int = 1 # How much light is lost when spreading into this block
+    random_ticks: bool = False
 
     def __init__(self, id: int, name: str) -> None:
         self.id = id
@@ -29,9 +41,19 @@ class Block:
         self.bounding_box = AABB(0, 0, 1, 1)
         self.texture_path = f'blocks/{name}.png'
         BLOCKS[id] = self
+        self._update_property_tables()
+
+    def _update_property_tables(self) -> None:
+        bb = self.bounding_box
+        SOLID_BLOCKS[self.id] = bb is not None
+        FULL_CUBE_BLOCKS[self.id] = bb is not None and (bb.x1, bb.y1, bb.x2, bb.y2) == (0, 0, 1, 1)
+        BLOCK_LUMINESCENCE[self.id] = self.luminescence
+        BLOCK_OPACITY[self.id] = self.opacity
+        RANDOM_TICK_BLOCKS[self.id] = self.random_ticks
 
     def set_bounding_box(self, bb: Optional['AABB']) -> Self:
         self.bounding_box = bb
+        self._update_property_tables()
         return self
 
     def set_turnable_texture(self, turnable: bool) -> Self:
@@ -44,10 +66,21 @@ class Block:
 
     def set_luminescence(self, luminescence: int) -> Self:
         self.luminescence = luminescence
+        self._update_property_tables()
+        return self
+
+    def set_opacity(self, opacity: int) -> Self:
+        self.opacity = opacity
+        self._update_property_tables()
+        return self
+
+    def set_random_ticks(self, random_ticks: bool) -> Self:
+        self.random_ticks = random_ticks
+        self._update_property_tables()
         return self
 
     def on_place(self, chunk: 'WorldChunk', x: int, y: int) -> None:
-        if chunk.get_tile_type(x, y).luminescence != self.luminescence:
+        if BLOCK_LUMINESCENCE[chunk.get_tile_id(x, y)] != self.luminescence:
             self.update_lighting(chunk, x, y)
 
     def update_lighting(self, chunk: 'WorldChunk', x: int, y: int) -> None:
@@ -78,10 +111,10 @@ class Block:
             up_blocklight = chunk.get_blocklight(x, y + 1)
         blocklight = max(
             self.luminescence,
-            left_blocklight - 1,
-            right_blocklight - 1,
-            down_blocklight - 1,
-            up_blocklight - 1
+            left_blocklight - self.opacity,
+            right_blocklight - self.opacity,
+            down_blocklight - self.opacity,
+            up_blocklight - self.opacity
         )
         old_blocklight = chunk.get_blocklight(x, y)
         chunk.set_blocklight(x, y, blocklight)
@@ -114,7 +147,7 @@ from and_beyond.physics import AABB
 AIR    = Block(0, 'air').set_bounding_box(None).set_texture_path(None)
 STONE  = Block(1, 'stone').set_turnable_texture(True)
 DIRT   = Block(2, 'dirt').set_turnable_texture(True)
-GRASS  = Block(3, 'grass')
+GRASS  = Block(3, 'grass').set_random_ticks(True)
 WOOD   = Block(4, 'wood')
 PLANKS = Block(5, 'planks')
 LEAVES = Block(6, 'leaves').set_turnable_texture(True)
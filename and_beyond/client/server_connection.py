@@ -30,10 +30,10 @@ from and_beyond.http_errors import Unauthorized
 from and_beyond.middleware import (BufferedWriterMiddleware, EncryptedReaderMiddleware, EncryptedWriterMiddleware,
                                    ReaderMiddleware, WriterMiddleware, create_writer_middlewares)
 from and_beyond.packet import (BasicAuthPacket, ChatPacket, ChunkPacket, ChunkUpdatePacket, ClientRequestPacket,
-                               DisconnectPacket, InventoryPacket, InventorySelectPacket, InventoryUpdatePacket, Packet,
-                               PingPacket, PlayerInfoPacket, PlayerPositionPacket, RemovePlayerPacket,
-                               ServerInfoPacket, SimplePlayerPositionPacket, UnloadChunkPacket, read_packet,
-                               read_packet_timeout, write_packet)
+                               DisconnectPacket, InventoryPacket, InventorySelectPacket, InventoryUpdatePacket,
+                               MultiChunkUpdatePacket, Packet, PingPacket, PlayerInfoPacket, PlayerPositionPacket,
+                               RemovePlayerPacket, ServerInfoPacket, SimplePlayerPositionPacket, UnloadChunkPacket,
+                               read_packet, read_packet_timeout, write_packet)
 from and_beyond.text import Text, plain_text, translatable_text
 from and_beyond.utils import DEBUG
 
@@ -148,6 +148,15 @@ class ServerConnection:
                     chunk = world.loaded_chunks[chunk_pos]
                     chunk.set_tile_type(packet.bx, packet.by, packet.block)
                     chunk.set_packed_lighting(packet.bx, packet.by, packet.packed_lighting)
+            elif isinstance(packet, MultiChunkUpdatePacket):
+                world = globals.local_world
+                chunk_pos = (packet.cx, packet.cy)
+                if chunk_pos in world.loaded_chunks:
+                    chunk = world.loaded_chunks[chunk_pos]
+                    for (bx, by, block, packed_lighting) in packet.updates:
+                        # The lighting was already calculated by the server
+                        chunk.set_tile_type_no_event(bx, by, block)
+                        chunk.set_packed_lighting(bx, by, packed_lighting)
             elif isinstance(packet, PlayerPositionPacket):
                 # globals.player.last_x = globals.player.render_x = globals.player.x
                 # globals.player.last_y = globals.player.render_y = globals.player.y
@@ -132,6 +132,7 @@ class ClientWorld(AbstractWorld):
 
 
 class ClientChunk(WorldChunk):
+    __slots__ = ('redraw', 'dirty', 'surf')
     redraw: set[tuple[int, int]]
     dirty: bool
     surf: pygame.surface.Surface
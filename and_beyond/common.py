@@ -2,7 +2,7 @@ import re
 from uuid import UUID
 
 PORT = 7932
-PROTOCOL_VERSION = 6
+PROTOCOL_VERSION = 7
 PROTOCOL_VERSION_MAP = [
     'a1.2.2', # 0
     'a1.2.3', # 1
@@ -6,6 +6,9 @@ import struct
 from typing import Optional, TypeVar, cast
 from uuid import UUID
 
+import numpy as np
+import numpy.typing as npt
+
 from and_beyond import blocks
 from and_beyond.abc import JsonSerializable, ValidJson
 from and_beyond.abstract_player import PlayerInventory
@@ -13,7 +16,7 @@ from and_beyond.blocks import Block, get_block_by_id
 from and_beyond.common import KEY_LENGTH, PROTOCOL_VERSION
 from and_beyond.middleware import ReaderMiddleware, WriterMiddleware
 from and_beyond.text import EMPTY_TEXT, MaybeText, Text, maybe_text_to_text
-from and_beyond.world import WorldChunk
+from and_beyond.world import WorldChunk, get_uniform_chunk, make_uniform_chunk
 
 _T_int = TypeVar('_T_int', bound=int)
 _T_JsonSerializable = TypeVar('_T_JsonSerializable', bound=JsonSerializable)
@@ -37,9 +40,11 @@ class PacketType(enum.IntEnum):
     INVENTORY = 13
     INVENTORY_UPDATE = 14
     INVENTORY_SELECT = 15
+    CHUNK_MULTI_UPDATE = 16
 
 
 class Packet(abc.ABC):
+    __slots__ = ()
     type: PacketType
 
     async def read(self, reader: ReaderMiddleware) -> None:
@@ -185,6 +190,7 @@ def _write_bools(writer: WriterMiddleware, *bools: bool) -> None:
 
 class ClientRequestPacket(Packet):
     type = PacketType.CLIENT_REQUEST
+    __slots__ = ('protocol_version',)
     protocol_version: int
 
     def __init__(self, protocol_version: int = PROTOCOL_VERSION) -> None:
@@ -199,6 +205,7 @@ class ClientRequestPacket(Packet):
 
 class ServerInfoPacket(Packet):
     type = PacketType.SERVER_INFO
+    __slots__ = ('offline', 'public_key')
     offline: bool
     public_key: bytes
 
@@ -217,6 +224,7 @@ class ServerInfoPacket(Packet):
 
 class BasicAuthPacket(Packet):
     type = PacketType.BASIC_AUTH
+    __slots__ = ('token',)
     token: bytes
 
     def __init__(self, token: bytes = b'') -> None:
@@ -231,6 +239,7 @@ class BasicAuthPacket(Packet):
 
 class PlayerInfoPacket(Packet):
     type = PacketType.PLAYER_INFO
+    __slots__ = ('uuid', 'name')
     uuid: UUID
     name: str
 
@@ -249,6 +258,7 @@ class PlayerInfoPacket(Packet):
 
 class RemovePlayerPacket(Packet):
     type = PacketType.REMOVE_PLAYER
+    __slots__ = ('player',)
     player: UUID
 
     def __init__(self, player: UUID = UUID(int=0)) -> None:
@@ -263,6 +273,7 @@ class RemovePlayerPacket(Packet):
 
 class DisconnectPacket(Packet):
     type = PacketType.DISCONNECT
+    __slots__ = ('reason',)
     reason: Text
 
     def __init__(self, reason: MaybeText = EMPTY_TEXT) -> None:
@@ -277,10 +288,12 @@ class DisconnectPacket(Packet):
 
 class PingPacket(Packet):
     type = PacketType.PING
+    __slots__ = ()
 
 
 class ChunkPacket(Packet):
     type = PacketType.CHUNK
+    __slots__ = ('chunk',)
     chunk: Optional[WorldChunk]
 
     def __init__(self, chunk: Optional[WorldChunk] = None) -> None:
@@ -291,22 +304,38 @@ class ChunkPacket(Packet):
         abs_y = await _read_varint(reader)
         x = await _read_varint(reader)
         y = await _read_varint(reader)
-        data = await reader.readexactly(1024)
+        uniform = await _read_bool(reader)
+        if uniform:
+            block_id = (await reader.readexactly(1))[0]
+            version = await _read_varint(reader)
+            data = make_uniform_chunk(block_id, version)
+        else:
+            data = await reader.readexactly(1024)
         self.chunk = WorldChunk.virtual_chunk(x, y, abs_x, abs_y, data)
 
     def write(self, writer: WriterMiddleware) -> None:
         if self.chunk is None:
-            writer.write(bytes(1028))
+            writer.write(bytes(4))
+            _write_bool(True, writer)
+            writer.write(bytes(2)) # Air, version 0
             return
         _write_varint(self.chunk.abs_x, writer)
         _write_varint(self.chunk.abs_y, writer)
         _write_varint(self.chunk.x, writer)
         _write_varint(self.chunk.y, writer)
-        writer.write(self.chunk.get_data())
+        data = self.chunk.get_data()
+        uniform = get_uniform_chunk(data)
+        _write_bool(uniform is not None, writer)
+        if uniform is not None:
+            writer.write(bytes((uniform[0],)))
+            _write_varint(uniform[1], writer)
+        else:
+            writer.write(data)
 
 
 class UnloadChunkPacket(Packet):
     type = PacketType.CHUNK_UNLOAD
+    __slots__ = ('x', 'y')
     x: int
     y: int
 
@@ -325,6 +354,7 @@ class UnloadChunkPacket(Packet):
 
 class ChunkUpdatePacket(Packet):
     type = PacketType.CHUNK_UPDATE
+    __slots__ = ('cx', 'cy', 'bx', 'by', 'block', 'packed_lighting')
     cx: int
     cy: int
     bx: int
@@ -360,8 +390,53 @@ class ChunkUpdatePacket(Packet):
         writer.write(bytes((self.bx, self.by, self.block.id, self.packed_lighting)))
 
 
+class MultiChunkUpdatePacket(Packet):
+    """
+    Updates several blocks in one chunk. Each update is (bx, by, block, packed_lighting), and is sent as three bytes.
+    """
+    type = PacketType.CHUNK_MULTI_UPDATE
+    __slots__ = ('cx', 'cy', 'updates')
+    cx: int
+    cy: int
+    updates: list[tuple[int, int, Block, int]]
+
+    def __init__(self, cx: int = 0, cy: int = 0, updates: Optional[list[tuple[int, int, Block, int]]] = None) -> None:
+        self.cx = cx
+        self.cy = cy
+        self.updates = [] if updates is None else updates
+
+    @classmethod
+    def from_chunk(cls, chunk: WorldChunk, mask: npt.NDArray[np.bool_]) -> 'MultiChunkUpdatePacket':
+        tiles = chunk.get_tile_view()
+        lighting = chunk.get_lighting_view()
+        return cls(chunk.abs_x, chunk.abs_y, [
+            (bx, by, get_block_by_id(tiles[bx, by]), int(lighting[bx, by]))
+            for (bx, by) in zip(*(axis.tolist() for axis in np.nonzero(mask)))
+        ])
+
+    async def read(self, reader: ReaderMiddleware) -> None:
+        self.cx = await _read_varint(reader)
+        self.cy = await _read_varint(reader)
+        count = await _read_varint(reader)
+        data = await reader.readexactly(count * 3)
+        self.updates = [
+            (data[i] >> 4, data[i] & 15, get_block_by_id(data[i + 1]), data[i + 2])
+            for i in range(0, count * 3, 3)
+        ]
+
+    def write(self, writer: WriterMiddleware) -> None:
+        _write_varint(self.cx, writer)
+        _write_varint(self.cy, writer)
+        _write_varint(len(self.updates), writer)
+        data = bytearray()
+        for (bx, by, block, packed_lighting) in self.updates:
+            data += bytes((bx << 4 | by, block.id, packed_lighting))
+        writer.write(data)
+
+
 class PlayerPositionPacket(Packet):
     type = PacketType.PLAYER_POS
+    __slots__ = ('player', 'x', 'y')
     player: UUID
     x: float
     y: float
@@ -384,6 +459,7 @@ class PlayerPositionPacket(Packet):
 
 class SimplePlayerPositionPacket(Packet):
     type = PacketType.SIMPLE_PLAYER_POS
+    __slots__ = ('x', 'y')
     x: float
     y: float
 
@@ -402,6 +478,7 @@ class SimplePlayerPositionPacket(Packet):
 
 class ChatPacket(Packet):
     type = PacketType.CHAT
+    __slots__ = ('message', 'time')
     message: Text
     time: float
 
@@ -420,6 +497,7 @@ class ChatPacket(Packet):
 
 class InventoryPacket(Packet):
     type = PacketType.INVENTORY
+    __slots__ = ('inventory',)
     inventory: PlayerInventory
 
     def __init__(self, inventory: PlayerInventory = PlayerInventory()) -> None:
@@ -434,6 +512,7 @@ class InventoryPacket(Packet):
 
 class InventoryUpdatePacket(Packet):
     type = PacketType.INVENTORY_UPDATE
+    __slots__ = ('slot', 'item', 'count')
     slot: int
     item: Optional[Block]
     count: int
@@ -458,6 +537,7 @@ class InventoryUpdatePacket(Packet):
 
 class InventorySelectPacket(Packet):
     type = PacketType.INVENTORY_SELECT
+    __slots__ = ('slot',)
     slot: int
 
     def __init__(self, slot: int = 0) -> None:
@@ -487,4 +567,5 @@ PACKET_CLASSES: list[type[Packet]] = [
     InventoryPacket, # INVENTORY
     InventoryUpdatePacket, # INVENTORY_UPDATE
     InventorySelectPacket, # INVENTORY_SELECT
+    MultiChunkUpdatePacket, # CHUNK_MULTI_UPDATE
 ]
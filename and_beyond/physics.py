@@ -14,6 +14,7 @@ EPSILON = 0.001
 
 
 class AABB:
+    __slots__ = ('x1', 'y1', 'x2', 'y2')
     x1: float
     y1: float
     x2: float
@@ -43,10 +44,13 @@ class AABB:
         return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
 
     def collides_with_world(self, world: 'AbstractWorld') -> Optional[tuple[int, int, Block]]:
+        x1 = int(self.x1)
+        y1 = int(self.y1)
+        world = world.get_neighbourhood(x1 >> 4, y1 >> 4)
         for x_off in range(-2, 3):
             for y_off in range(-2, 3):
-                x = int(self.x1) + x_off
-                y = int(self.y1) + y_off
+                x = x1 + x_off
+                y = y1 + y_off
                 block = world.get_tile_type_or_none(x, y)
                 if block is None or block.bounding_box is None:
                     continue
@@ -0,0 +1,283 @@
+import abc
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from json.decoder import JSONDecodeError
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
+from uuid import UUID
+
+import aiofiles
+
+if TYPE_CHECKING:
+    from and_beyond.world import World
+
+PLAYER_DB_VERSION = 1
+
+PlayerData = dict[str, Any]
+
+_T = TypeVar('_T')
+
+
+class PlayerStore(abc.ABC):
+    """Stores the saved data of every player that has joined a world, along with the name each player last used."""
+
+    async def ainit(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def get_uuid(self, name: str) -> Optional[UUID]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_name(self, uuid: UUID) -> Optional[str]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set_name(self, name: str, uuid: UUID) -> None:
+        """Records that the player with `uuid` is called `name`, and that no other player is."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def load(self, uuid: UUID) -> Optional[PlayerData]:
+        """Returns the saved data of a player, or None if they have never been saved."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def save(self, uuid: UUID, data: PlayerData) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        await self.flush()
+
+
+class JsonPlayerStore(PlayerStore):
+    """
+    Stores each player in a JSON file in the world's player folder. Names are kept in the `player_cache` of the world
+    meta.
+    """
+    world: 'World'
+
+    def __init__(self, world: 'World') -> None:
+        self.world = world
+
+    def get_path(self, uuid: UUID) -> Path:
+        return self.world.players_path / f'{uuid}.json'
+
+    async def get_uuid(self, name: str) -> Optional[UUID]:
+        return self.world._players_by_name.get(name)
+
+    async def get_name(self, uuid: UUID) -> Optional[str]:
+        return self.world._players_by_uuid.get(uuid)
+
+    async def set_name(self, name: str, uuid: UUID) -> None:
+        world = self.world
+        if (old_name := world._players_by_uuid.pop(uuid, None)) is not None:
+            world._players_by_name.pop(old_name, None)
+        if (old_uuid := world._players_by_name.pop(name, None)) is not None:
+            world._players_by_uuid.pop(old_uuid, None)
+        world._players_by_name[name] = uuid
+        world._players_by_uuid[uuid] = name
+
+    def _rename_old_save(self, path: Path) -> None:
+        old_path = self.world.players_path / '00000000-0000-0000-0000-000000005db0.json'
+        if old_path.exists() and not path.exists():
+            logging.info('Player used old save filename, renaming...')
+            old_path.rename(path) # Rename singleplayer saves
+
+    async def load(self, uuid: UUID) -> Optional[PlayerData]:
+        loop = asyncio.get_running_loop()
+        path = self.get_path(uuid)
+        if uuid.int == 0:
+            await loop.run_in_executor(None, self._rename_old_save, path)
+        try:
+            async with aiofiles.open(path) as fp:
+                raw_data = await fp.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return await loop.run_in_executor(None, json.loads, raw_data)
+        except JSONDecodeError:
+            return {}
+
+    async def save(self, uuid: UUID, data: PlayerData) -> None:
+        loop = asyncio.get_running_loop()
+        raw_data = await loop.run_in_executor(None, partial(json.dumps, data, indent=2))
+        async with aiofiles.open(self.get_path(uuid), 'w') as fp:
+            await fp.write(raw_data)
+
+
+class SqlitePlayerStore(PlayerStore):
+    """
+    Stores every player in one SQLite database, with indexed lookups by UUID and by name. The database is only accessed
+    from a dedicated thread. Saves are queued and written together in a single transaction, either right after the
+    current event loop iteration or when flush is called. Reads see queued saves immediately. Queued data is only
+    serialized on the database thread.
+    """
+    path: Path
+    executor: ThreadPoolExecutor
+    connection: Optional[sqlite3.Connection]
+    pending_data: dict[UUID, PlayerData]
+    pending_names: dict[UUID, str]
+    flush_task: Optional[asyncio.Task[None]]
+    flush_lock: asyncio.Lock
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.executor = ThreadPoolExecutor(1, 'PlayerStoreThread')
+        self.connection = None
+        self.pending_data = {}
+        self.pending_names = {}
+        self.flush_task = None
+        self.flush_lock = asyncio.Lock()
+
+    async def _run(self, fn: Callable[..., _T], *args: Any) -> _T:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _connect(self) -> None:
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS players (uuid TEXT PRIMARY KEY, name TEXT, data TEXT)')
+            connection.execute('CREATE INDEX IF NOT EXISTS players_name ON players (name)')
+        self.connection = connection
+
+    async def ainit(self) -> None:
+        await self._run(self._connect)
+
+    def _get_version(self) -> int:
+        assert self.connection is not None
+        return self.connection.execute('PRAGMA user_version').fetchone()[0]
+
+    def _import_json(self, players_path: Path, names: dict[UUID, str]) -> int:
+        assert self.connection is not None
+        rows: dict[UUID, tuple[Optional[str], Optional[str]]] = {uuid: (name, None) for (uuid, name) in names.items()}
+        for path in players_path.glob('*.json'):
+            try:
+                uuid = UUID(path.stem)
+                data = json.loads(path.read_text())
+            except (ValueError, OSError):
+                logging.warn('Skipping invalid player file %s', path.name, exc_info=True)
+                continue
+            rows[uuid] = (names.get(uuid), json.dumps(data, separators=(',', ':')))
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO players (uuid, name, data) VALUES (?, ?, ?) '
+                'ON CONFLICT (uuid) DO UPDATE SET name = excluded.name, data = excluded.data',
+                ((str(uuid), name, data) for (uuid, (name, data)) in rows.items())
+            )
+            self.connection.execute(f'PRAGMA user_version = {PLAYER_DB_VERSION}')
+        return len(rows)
+
+    async def migrate_json(self, players_path: Path, names: dict[UUID, str]) -> None:
+        """
+        Imports the players saved as JSON files (see JsonPlayerStore) along with their names, if that hasn't been done
+        yet. The JSON files are left as they are.
+        """
+        if await self._run(self._get_version) >= PLAYER_DB_VERSION:
+            return
+        start = time.perf_counter()
+        count = await self._run(self._import_json, players_path, names)
+        end = time.perf_counter()
+        logging.info('Migrated %i players from JSON files in %f seconds', count, end - start)
+
+    def _get_uuid(self, name: str) -> Optional[UUID]:
+        assert self.connection is not None
+        row = self.connection.execute('SELECT uuid FROM players WHERE name = ?', (name,)).fetchone()
+        return None if row is None else UUID(row[0])
+
+    async def get_uuid(self, name: str) -> Optional[UUID]:
+        for (uuid, pending_name) in self.pending_names.items():
+            if pending_name == name:
+                return uuid
+        uuid = await self._run(self._get_uuid, name)
+        if uuid is not None and self.pending_names.get(uuid, name) != name:
+            return None # Renamed, but not written yet
+        return uuid
+
+    def _get_row(self, uuid: UUID) -> Optional[tuple[Optional[str], Optional[str]]]:
+        assert self.connection is not None
+        return self.connection.execute('SELECT name, data FROM players WHERE uuid = ?', (str(uuid),)).fetchone()
+
+    async def get_name(self, uuid: UUID) -> Optional[str]:
+        if uuid in self.pending_names:
+            return self.pending_names[uuid]
+        row = await self._run(self._get_row, uuid)
+        return None if row is None else row[0]
+
+    async def set_name(self, name: str, uuid: UUID) -> None:
+        self.pending_names[uuid] = name
+        self._schedule_flush()
+
+    async def load(self, uuid: UUID) -> Optional[PlayerData]:
+        if uuid in self.pending_data:
+            return self.pending_data[uuid]
+        row = await self._run(self._get_row, uuid)
+        raw_data = None if row is None else row[1]
+        if raw_data is None:
+            return None
+        try:
+            return json.loads(raw_data)
+        except JSONDecodeError:
+            return {}
+
+    async def save(self, uuid: UUID, data: PlayerData) -> None:
+        """Queues `data` to be saved. It must not be modified afterwards."""
+        self.pending_data[uuid] = data
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    def _write(self, names: dict[UUID, str], data: dict[UUID, PlayerData]) -> None:
+        assert self.connection is not None
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE players SET name = NULL WHERE name = ? AND uuid != ?',
+                ((name, str(uuid)) for (uuid, name) in names.items())
+            )
+            self.connection.executemany(
+                'INSERT INTO players (uuid, name) VALUES (?, ?) ON CONFLICT (uuid) DO UPDATE SET name = excluded.name',
+                ((str(uuid), name) for (uuid, name) in names.items())
+            )
+            self.connection.executemany(
+                'INSERT INTO players (uuid, data) VALUES (?, ?) ON CONFLICT (uuid) DO UPDATE SET data = excluded.data',
+                (
+                    (str(uuid), json.dumps(player_data, separators=(',', ':')))
+                    for (uuid, player_data) in data.items()
+                )
+            )
+
+    async def flush(self) -> None:
+        async with self.flush_lock:
+            if not self.pending_names and not self.pending_data:
+                return
+            names = self.pending_names.copy()
+            data = self.pending_data.copy()
+            await self._run(self._write, names, data)
+            # Only forget the writes that weren't replaced while this transaction was running
+            for (uuid, name) in names.items():
+                if self.pending_names.get(uuid) == name:
+                    del self.pending_names[uuid]
+            for (uuid, player_data) in data.items():
+                if self.pending_data.get(uuid) is player_data:
+                    del self.pending_data[uuid]
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    async def close(self) -> None:
+        await self.flush()
+        await self._run(self._close)
+        self.executor.shutdown()
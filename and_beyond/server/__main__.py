@@ -1,3 +1,4 @@
 from and_beyond.server.main import main
 
-main()
+if __name__ == '__main__':
+    main()
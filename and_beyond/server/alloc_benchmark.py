@@ -0,0 +1,198 @@
+"""
+Measures the memory used by the objects that the server creates every tick, comparing their slotted layout with the
+dict-backed layout they would have without __slots__. Run with
+`python -m and_beyond.server.alloc_benchmark [--players <count>] [--ticks <count>]`.
+"""
+import math
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from and_beyond import blocks
+from and_beyond.abstract_player import InventoryItem
+from and_beyond.common import VIEW_DISTANCE_BOX
+from and_beyond.middleware import WriterMiddlewareABC
+from and_beyond.packet import ChunkUpdatePacket, PlayerPositionPacket
+from and_beyond.physics import AABB, PlayerPhysics
+from and_beyond.text import Text
+from and_beyond.utils import get_opt
+from and_beyond.world import AbstractWorld, ChunkNeighbourhood, WorldChunk, make_uniform_chunk
+
+SAMPLE_COUNT = 10000
+
+_dict_backed_classes: dict[type, type] = {}
+
+
+class _FlatWorld(AbstractWorld):
+    """A world of virtual chunks, with stone below y=0 and air above it."""
+    chunks: dict[tuple[int, int], WorldChunk]
+
+    def __init__(self) -> None:
+        self.chunks = {}
+
+    def get_chunk_or_none(self, x: int, y: int) -> Optional[WorldChunk]:
+        chunk = self.chunks.get((x, y))
+        if chunk is None:
+            block = blocks.STONE if y < 0 else blocks.AIR
+            chunk = WorldChunk.virtual_chunk(x & 15, y & 15, x, y, make_uniform_chunk(block.id, 1))
+            self.chunks[(x, y)] = chunk
+        return chunk
+
+
+class _NullWriter(WriterMiddlewareABC):
+    def __init__(self) -> None:
+        pass
+
+    def write(self, data: bytes) -> None:
+        pass
+
+
+def _get_slots(cls: type) -> list[str]:
+    return [slot for klass in reversed(cls.__mro__) for slot in getattr(klass, '__slots__', ())]
+
+
+def _copy_attributes(obj: Any, to: type) -> Any:
+    # Attribute values are shared with the original, so only the object itself is measured
+    copy = to.__new__(to)
+    for slot in _get_slots(type(obj)):
+        if hasattr(obj, slot):
+            setattr(copy, slot, getattr(obj, slot))
+    return copy
+
+
+def _get_dict_backed_class(cls: type) -> type:
+    """Returns a plain class to copy instances of `cls` into, which is how they would be laid out without slots."""
+    if cls not in _dict_backed_classes:
+        _dict_backed_classes[cls] = type(cls.__name__, (), {})
+    return _dict_backed_classes[cls]
+
+
+def measure_object_size(factory: Callable[[], Any]) -> float:
+    """Returns the average number of bytes allocated for each object returned by `factory`."""
+    objs: list[Any] = [None] * SAMPLE_COUNT
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(SAMPLE_COUNT):
+            objs[i] = factory()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / SAMPLE_COUNT
+
+
+def simulate_tick(world: AbstractWorld, players: list[SimpleNamespace], rand: random.Random) -> None:
+    """Does the per-player work from Client.tick: movement validation, the grounded check, and position packets."""
+    writer = _NullWriter()
+    for player in players:
+        old_cx = int(player.x) >> 4
+        old_cy = int(player.y) >> 4
+        new_x = player.x + rand.uniform(-2, 2)
+        distance = abs(new_x - player.x)
+        step_count = math.ceil(distance)
+        step_x = (new_x - player.x) / max(step_count, 1)
+        neighbourhood = world.get_neighbourhood(old_cx, old_cy)
+        for step in range(step_count - 1):
+            player.x += step_x
+            if player.physics.offset_bb.expand(-0.2).collides_with_world(neighbourhood):
+                break
+        else:
+            player.x = new_x
+        player.physics.offset_bb.expand(1).collides_with_world(world)
+        packet = PlayerPositionPacket(player.uuid, player.x, player.y)
+        for other in players:
+            if other is not player:
+                packet.write(writer)
+
+
+def count_allocations(
+    classes: list[type], fn: Callable[[], None]
+) -> dict[type, int]:
+    """Calls `fn`, and returns how many instances of each class were constructed during it."""
+    counts = dict.fromkeys(classes, 0)
+    original_inits = {cls: cls.__dict__['__init__'] for cls in classes}
+
+    def make_counting_init(cls: type, init: Callable[..., None]) -> Callable[..., None]:
+        def counting_init(self: Any, *args: Any, **kwargs: Any) -> None:
+            counts[cls] += 1
+            init(self, *args, **kwargs)
+        return counting_init
+
+    for (cls, init) in original_inits.items():
+        setattr(cls, '__init__', make_counting_init(cls, init))
+    try:
+        fn()
+    finally:
+        for (cls, init) in original_inits.items():
+            setattr(cls, '__init__', init)
+    return counts
+
+
+def benchmark(player_count: int = 10, tick_count: int = 200) -> None:
+    chunk_data = bytearray(1024)
+    factories: dict[type, Callable[[], Any]] = {
+        AABB: lambda: AABB(0.2, 0, 0.8, 1.5),
+        ChunkNeighbourhood: lambda: ChunkNeighbourhood(world, 0, 0),
+        WorldChunk: lambda: WorldChunk.virtual_chunk(0, 0, 0, 0, chunk_data),
+        InventoryItem: lambda: InventoryItem(blocks.STONE, 64),
+        Text: lambda: Text('chat.message', True),
+        PlayerPositionPacket: lambda: PlayerPositionPacket(UUID(int=1), 0.5, 0.5),
+        ChunkUpdatePacket: lambda: ChunkUpdatePacket(0, 0, 1, 1, blocks.STONE, 0),
+    }
+    world = _FlatWorld()
+    sizes: dict[type, tuple[float, float]] = {}
+    print('Bytes per object (without slots -> with slots):')
+    for (cls, factory) in factories.items():
+        sample = factory()
+        dict_backed_cls = _get_dict_backed_class(cls)
+        sizes[cls] = (
+            measure_object_size(lambda: _copy_attributes(sample, dict_backed_cls)),
+            measure_object_size(lambda: _copy_attributes(sample, cls)),
+        )
+        print(f'  {cls.__name__:<22} {sizes[cls][0]:>6.0f} -> {sizes[cls][1]:>6.0f}')
+
+    rand = random.Random(1)
+    players = []
+    for i in range(player_count):
+        player = SimpleNamespace(uuid=UUID(int=i), x=i * 256 + 0.5, y=0.0, world=world)
+        player.physics = PlayerPhysics(player) # type: ignore
+        players.append(player)
+
+    def run() -> None:
+        for tick in range(tick_count):
+            simulate_tick(world, players, rand)
+
+    start = time.perf_counter()
+    counts = count_allocations([AABB, ChunkNeighbourhood, PlayerPositionPacket], run)
+    end = time.perf_counter()
+    print(f'Per tick with {player_count} players ({(end - start) / tick_count * 1000:.3f} ms/tick):')
+    total_before = total_after = total_objects = 0.0
+    for (cls, count) in counts.items():
+        per_tick = count / tick_count
+        before, after = sizes[cls]
+        total_objects += per_tick
+        total_before += per_tick * before
+        total_after += per_tick * after
+        print(f'  {cls.__name__:<22} {per_tick:>8.1f} objects, {per_tick * before:>9.0f} -> {per_tick * after:>9.0f} bytes')
+    print(f'  {"Total":<22} {total_objects:>8.1f} objects, {total_before:>9.0f} -> {total_after:>9.0f} bytes')
+    chunk_count = player_count * VIEW_DISTANCE_BOX * VIEW_DISTANCE_BOX
+    before, after = sizes[WorldChunk]
+    print(
+        f'Loaded chunk objects ({chunk_count} chunks, excluding chunk data): '
+        f'{chunk_count * before:.0f} -> {chunk_count * after:.0f} bytes'
+    )
+
+
+if __name__ == '__main__':
+    try:
+        player_count = int(get_opt('--players'))
+    except (ValueError, IndexError):
+        player_count = 10
+    try:
+        tick_count = int(get_opt('--ticks'))
+    except (ValueError, IndexError):
+        tick_count = 200
+    benchmark(player_count, tick_count)
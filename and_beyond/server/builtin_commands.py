@@ -1,4 +1,5 @@
 import sys
+import time
 
 import humanize
 
@@ -59,6 +60,28 @@ async def stats_command(sender: AbstractCommandSender, args: str) -> None:
             f'{humanize.naturalsize(memory_usage * 1024, gnu=True)} '
             f'({memory_usage}K)'
         )
+    world = sender.server.world
+    if world is not None:
+        await sender.reply(
+            f'Open sections: {len(world.open_sections)}/{world.max_open_sections} '
+            f'({humanize.naturalsize(world.get_mapped_bytes(), gnu=True)} mapped)'
+        )
+        await sender.reply(
+            f'Section cache: {world.section_hits} hits, {world.section_misses} misses, '
+            f'{world.section_evictions} evictions'
+        )
+        await sender.reply(
+            f'Last autosave: {sender.server.last_autosave_players} player(s), '
+            f'{len(sender.server.last_autosave_meta_fields)} meta field(s) in '
+            f'{sender.server.last_autosave_time * 1000:.2f} ms '
+            f'({sender.server.last_autosave_write_time * 1000:.2f} ms writing)'
+        )
+    pool = sender.server.chunk_generation_pool
+    if pool is not None:
+        await sender.reply(
+            f'Chunk generation: {pool.queue_depth} in flight, {pool.generated_count} generated '
+            f'({pool.shared_count} shared requests), {pool.mean_latency * 1000:.2f} ms mean latency'
+        )
 
 
 @function_command('tp', 'Teleport a player', 1)
@@ -230,6 +253,36 @@ async def deop_command(sender: AbstractCommandSender, args: str) -> None:
     await op_command.call(sender, f'{argv[0]} 0')
 
 
+@function_command('save-all', 'Save all modified chunks to disk', 2)
+async def save_all_command(sender: AbstractCommandSender, args: str) -> None:
+    await sender.reply('Saving...')
+    start = time.perf_counter()
+    chunk_count, bytes_written = await sender.server.save_all()
+    end = time.perf_counter()
+    await sender.reply_broadcast(
+        f'Saved {chunk_count} chunk(s) '
+        f'({humanize.naturalsize(bytes_written, gnu=True)} written) in {end - start:.3f} seconds'
+    )
+
+
+@function_command('compact', "Defragment the sections that aren't loaded", 4)
+async def compact_command(sender: AbstractCommandSender, args: str) -> None:
+    world = sender.server.world
+    assert world is not None
+    await sender.reply('Compacting...')
+    start = time.perf_counter()
+    compacted_count, reclaimed_bytes, errors_count = await world.compact_sections()
+    end = time.perf_counter()
+    await world.save_manifest()
+    message = (
+        f'Compacted {compacted_count} section(s) ({humanize.naturalsize(reclaimed_bytes, gnu=True)} reclaimed) '
+        f'in {end - start:.3f} seconds'
+    )
+    if errors_count:
+        message += f' ({errors_count} failed, see the server log)'
+    await sender.reply(message)
+
+
 @function_command('stop', 'Stop the server', 4)
 async def stop_command(sender: AbstractCommandSender, args: str) -> None:
     await sender.reply_broadcast('Stopping server...')
@@ -205,7 +205,7 @@ class Client:
             self.uuid = packet.uuid
             self.nickname = packet.name
             assert self.server.world is not None
-            if (new_uuid := self.server.world._players_by_name.get(self.nickname)) is not None:
+            if (new_uuid := await self.server.world.player_store.get_uuid(self.nickname)) is not None:
                 if packet.uuid.int != 0 and new_uuid != packet.uuid:
                     await self.disconnect(translatable_text('connect.server.uuid_validate_failure'))
                     return False
@@ -271,10 +271,18 @@ class Client:
 
     async def load_chunk(self, x: int, y: int) -> None:
         assert self.server.world is not None
-        if (x, y) in self.server.all_loaded_chunks:
-            chunk = self.server.all_loaded_chunks[(x, y)]
-        else:
-            chunk = self.server.world.get_generated_chunk(x, y, self.server.world_generator)
+        chunk = self.server.all_loaded_chunks.get((x, y))
+        if chunk is None:
+            assert self.server.chunk_generation_pool is not None
+            try:
+                chunk = await self.server.world.get_generated_chunk_async(x, y, self.server.chunk_generation_pool)
+            except Exception:
+                logging.warn('Failed to generate chunk (%i, %i) in a worker, generating it here', x, y, exc_info=True)
+                chunk = self.server.world.get_generated_chunk(x, y, self.server.world_generator)
+            if self.disconnecting or (x, y) in self.loaded_chunks:
+                return # The client left or loaded the chunk again while it was being generated
+            # Another client may have loaded it while it was being generated
+            chunk = self.server.all_loaded_chunks.get((x, y), chunk)
         self.loaded_chunks[(x, y)] = chunk
         self.server.all_loaded_chunks[(x, y)] = chunk
         chunk.mark_loaded()
@@ -286,7 +294,7 @@ class Client:
             if c.mark_unloaded() <= 0:
                 self.server.all_loaded_chunks.pop((x, y), None)
                 if c.section is not None:
-                    c.section.cached_chunks.pop((c.x, c.y), None)
+                    c.section.uncache_chunk(c.x, c.y)
                     if c.section.mark_unloaded() <= 0:
                         logging.debug('Closing section (%i, %i) because its reference count reached 0', x >> 4, y >> 4)
                         start = time.perf_counter()
@@ -437,15 +445,16 @@ class Client:
                     step_x = distance_x / step_count
                     step_y = distance_y / step_count
                     assert self.server.world is not None
+                    neighbourhood = self.server.world.get_neighbourhood(old_cx, old_cy)
                     self.player.x += step_x
                     self.player.y += step_y
                     for step in range(step_count - 1):
                         self.player.x += step_x
-                        if self.player.physics.offset_bb.expand(-0.2).collides_with_world(self.server.world):
+                        if self.player.physics.offset_bb.expand(-0.2).collides_with_world(neighbourhood):
                             collided = True
                             break
                         self.player.y += step_y
-                        if self.player.physics.offset_bb.expand(-0.2).collides_with_world(self.server.world):
+                        if self.player.physics.offset_bb.expand(-0.2).collides_with_world(neighbourhood):
                             collided = True
                             break
             if collided:
@@ -535,9 +544,10 @@ class Client:
         self._writer.close()
         if self.player is not None:
             start = time.perf_counter()
-            await self.player.save()
-            end = time.perf_counter()
-            logging.debug('Player %s data saved in %f seconds', self, end - start)
+            if await self.player.save_if_dirty():
+                end = time.perf_counter()
+                logging.debug('Player %s data saved in %f seconds', self, end - start)
+            self.player.world.release_player(self.player)
         for (cx, cy) in list(self.loaded_chunks.keys()):
             await self.unload_chunk(cx, cy, True)
         try:
@@ -2,7 +2,6 @@ import abc
 import asyncio
 import logging
 import time
-from json.decoder import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 from uuid import UUID
 
@@ -167,19 +166,8 @@ async def evaluate_offline_player(arg: str, sender: AbstractCommandSender) -> Op
     else:
         if uuid in server.clients_by_uuid:
             return server.clients_by_uuid[uuid].player
-        player = world.get_player_by_uuid(uuid)
-        try:
-            await player.ainit()
-        except (FileNotFoundError, JSONDecodeError):
-            pass
-        else:
-            return player
+        return await world.get_player_by_uuid(uuid)
     try:
-        player = world.get_player_by_name(arg)
+        return await world.get_player_by_name(arg)
     except KeyError:
         return None
-    try:
-        await player.ainit()
-    except (FileNotFoundError, JSONDecodeError):
-        return None
-    return player
@@ -0,0 +1,23 @@
+import logging
+from typing import Optional
+
+import humanize
+
+from and_beyond.server.world_tool import run_world_tool
+from and_beyond.world import World
+
+
+async def compact_world(world: World, jobs: Optional[int]) -> int:
+    _, optimize_errors = await world.optimize_sections(jobs)
+    _, reclaimed_bytes, compact_errors = await world.compact_sections(jobs)
+    await world.save_manifest()
+    logging.info('Reclaimed %s', humanize.naturalsize(reclaimed_bytes, gnu=True))
+    return 1 if optimize_errors or compact_errors else 0
+
+
+def main() -> None:
+    run_world_tool('Compact', 'Compacting', compact_world)
+
+
+if __name__ == '__main__':
+    main()
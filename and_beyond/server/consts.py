@@ -1 +1,6 @@
 GC_TIME_SECONDS = 60 * 60 * 3 # Run every 3 hours
+SAVE_INTERVAL_SECONDS = 30
+SAVE_BUDGET_BYTES = 4 * 1024 * 1024 # Per save interval
+PLAYER_SAVE_INTERVAL_SECONDS = 5
+PLAYER_SAVES_PER_TICK = 16
+GENERATION_WORKERS = 2
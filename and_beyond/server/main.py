@@ -15,6 +15,8 @@ from typing import Any, BinaryIO, Optional
 from uuid import UUID
 
 import colorama
+import numpy as np
+import numpy.typing as npt
 
 import and_beyond.server.builtin_commands # pyright: ignore [reportUnusedImport]
 from and_beyond import blocks
@@ -22,15 +24,21 @@ from and_beyond.blocks import Block
 from and_beyond.common import AUTH_SERVER, PORT, RANDOM_TICK_RATE
 from and_beyond.http_auth import AuthClient
 from and_beyond.http_errors import InsecureAuth
-from and_beyond.packet import ChunkUpdatePacket, Packet
+from and_beyond.packet import ChunkPacket, ChunkUpdatePacket, MultiChunkUpdatePacket, Packet
 from and_beyond.pipe_commands import PipeCommandsToServer, read_pipe
 from and_beyond.server.client import Client
 from and_beyond.server.commands import DEFAULT_COMMANDS, AbstractCommandSender, CommandDict, ConsoleCommandSender
-from and_beyond.server.consts import GC_TIME_SECONDS
+from and_beyond.server.consts import (
+    GC_TIME_SECONDS, GENERATION_WORKERS, PLAYER_SAVE_INTERVAL_SECONDS, PLAYER_SAVES_PER_TICK, SAVE_BUDGET_BYTES,
+    SAVE_INTERVAL_SECONDS
+)
 from and_beyond.server.world_gen.core import WorldGenerator
+from and_beyond.server.world_gen.pool import ChunkGenerationPool
 from and_beyond.text import MaybeText, translatable_text
 from and_beyond.utils import ainput, get_opt, init_logger, mean, shuffled
-from and_beyond.world import World, WorldChunk
+from and_beyond.world import (
+    MAX_MAPPED_BYTES, MAX_OPEN_SECTIONS, SECTION_EXTENT_SIZE, OfflinePlayer, World, WorldChunk
+)
 
 if sys.platform == 'win32':
     import msvcrt
@@ -48,6 +56,15 @@ class AsyncServer:
     paused: bool
     has_been_shutdown: bool
     gc_task: Optional[asyncio.Task[None]]
+    save_task: Optional[asyncio.Task[None]]
+    save_interval: float
+    save_budget: int
+    autosave_task: Optional[asyncio.Task[None]]
+    player_save_interval: float
+    last_autosave_players: int
+    last_autosave_meta_fields: list[str]
+    last_autosave_write_time: float
+    last_autosave_time: float
     all_loaded_chunks: dict[tuple[int, int], 'WorldChunk']
 
     host: str
@@ -65,6 +82,7 @@ class AsyncServer:
     last_spt: float
     world: Optional[World]
     world_generator: WorldGenerator
+    chunk_generation_pool: Optional[ChunkGenerationPool]
 
     pipe_commands_task: Optional[asyncio.Task[None]]
     console_commands_task: Optional[asyncio.Task[None]]
@@ -79,9 +97,19 @@ class AsyncServer:
         self.paused = False
         self.has_been_shutdown = False
         self.gc_task = None
+        self.save_task = None
+        self.save_interval = SAVE_INTERVAL_SECONDS
+        self.save_budget = SAVE_BUDGET_BYTES
+        self.autosave_task = None
+        self.player_save_interval = PLAYER_SAVE_INTERVAL_SECONDS
+        self.last_autosave_players = 0
+        self.last_autosave_meta_fields = []
+        self.last_autosave_write_time = 0
+        self.last_autosave_time = 0
         self.all_loaded_chunks = {}
         self.async_server = None
         self.world = None
+        self.chunk_generation_pool = None
         self.clients = []
         self.clients_by_uuid = {}
         self.clients_by_name = {}
@@ -241,9 +269,46 @@ class AsyncServer:
             world_name = 'world'
         logging.info('Loading world "%s"', world_name)
 
-        self.world = World(world_name, auto_optimize=True)
+        try:
+            self.save_interval = float(get_opt('--save-interval'))
+        except (ValueError, IndexError):
+            pass
+        try:
+            self.save_budget = int(get_opt('--save-budget')) * 1024
+        except (ValueError, IndexError):
+            pass
+        try:
+            self.player_save_interval = float(get_opt('--player-save-interval'))
+        except (ValueError, IndexError):
+            pass
+        try:
+            max_open_sections = int(get_opt('--max-open-sections'))
+        except (ValueError, IndexError):
+            max_open_sections = MAX_OPEN_SECTIONS
+        try:
+            max_mapped_bytes = int(get_opt('--max-section-memory')) * 1024 * 1024
+        except (ValueError, IndexError):
+            max_mapped_bytes = MAX_MAPPED_BYTES
+        try:
+            section_extent_size = int(get_opt('--section-extent')) * 1024
+        except (ValueError, IndexError):
+            section_extent_size = SECTION_EXTENT_SIZE
+
+        self.world = World(
+            world_name,
+            auto_optimize=True,
+            max_open_sections=max_open_sections,
+            max_mapped_bytes=max_mapped_bytes,
+            section_extent_size=section_extent_size,
+            sqlite_players='--sqlite-players' in sys.argv,
+        )
         await self.world.ainit('--no-optimize' not in sys.argv)
         self.world_generator = WorldGenerator(self.world.meta['seed'])
+        try:
+            generation_workers = int(get_opt('--generation-workers'))
+        except (ValueError, IndexError):
+            generation_workers = GENERATION_WORKERS
+        self.chunk_generation_pool = ChunkGenerationPool(self.world.meta['seed'], generation_workers)
         logging.info('Locating spawn location for world...')
         start = time.perf_counter()
         spawn_x, spawn_y = self.world.find_spawn(self.world_generator)
@@ -263,6 +328,10 @@ class AsyncServer:
             logging.info('Running in no-op mode')
         logging.debug('Setting up backup section GC')
         self.gc_task = self.loop.create_task(self.section_gc())
+        logging.debug('Setting up periodic chunk saving')
+        self.save_task = self.loop.create_task(self.periodic_save())
+        logging.debug('Setting up player autosaving')
+        self.autosave_task = self.loop.create_task(self.autosave())
         time_since_last_second = 0
         while self.running:
             if not self.multiplayer:
@@ -327,6 +396,8 @@ class AsyncServer:
                     i = 0
 
     async def random_tick_chunk(self, chunk: WorldChunk, x: int, y: int) -> None:
+        if not blocks.RANDOM_TICK_BLOCKS[chunk.get_tile_id(x, y)]:
+            return
         block = chunk.get_tile_type(x, y)
         if block == blocks.GRASS:
             block_above = self.get_block_rel_chunk(chunk, x, y + 1)
@@ -377,6 +448,68 @@ class AsyncServer:
             end = time.perf_counter()
             logging.debug('Successfully closed %i section(s) in %f seconds', len(to_close), end - start)
 
+    async def periodic_save(self) -> None:
+        while not self.running:
+            await asyncio.sleep(0)
+        assert self.world is not None
+        while self.running:
+            await asyncio.sleep(self.save_interval)
+            start = time.perf_counter()
+            chunk_count, bytes_written = await self.world.flush_sections(self.save_budget)
+            # Nothing holds on to chunks between ticks except loaded chunks, which pin their sections, so this is a safe
+            # point to close sections
+            evicted = self.world.evict_sections()
+            self.world.release_unused_chunks()
+            await self.world.save_manifest()
+            end = time.perf_counter()
+            if chunk_count or evicted:
+                logging.debug(
+                    'Saved %i dirty chunk(s) (%i bytes) and closed %i section(s) in %f seconds',
+                    chunk_count, bytes_written, evicted, end - start
+                )
+
+    async def autosave(self) -> None:
+        while not self.running:
+            await asyncio.sleep(0)
+        assert self.world is not None
+        while self.running:
+            await asyncio.sleep(self.player_save_interval)
+            start = time.perf_counter()
+            players: dict[UUID, OfflinePlayer] = {
+                client.player.uuid: client.player for client in self.clients if client.player is not None
+            }
+            for player in self.world.player_cache.values():
+                players.setdefault(player.uuid, player)
+            dirty = [player for player in players.values() if player.is_dirty()]
+            write_time = 0.0
+            # Spread the saves over several ticks, so a lot of players saving at once doesn't cause a lag spike
+            for i in range(0, len(dirty), PLAYER_SAVES_PER_TICK):
+                if i:
+                    await asyncio.sleep(0.05)
+                batch_start = time.perf_counter()
+                await asyncio.gather(*(player.save() for player in dirty[i:i + PLAYER_SAVES_PER_TICK]))
+                write_time += time.perf_counter() - batch_start
+            meta_start = time.perf_counter()
+            meta_fields = await self.world.save_meta_if_changed()
+            end = time.perf_counter()
+            write_time += end - meta_start
+            self.last_autosave_players = len(dirty)
+            self.last_autosave_meta_fields = meta_fields
+            self.last_autosave_write_time = write_time
+            self.last_autosave_time = end - start
+            if dirty or meta_fields:
+                logging.debug(
+                    'Autosaved %i player(s) and meta fields %s in %f seconds (%f seconds writing)',
+                    len(dirty), meta_fields, end - start, write_time
+                )
+
+    async def save_all(self) -> tuple[int, int]:
+        assert self.world is not None
+        result = await self.world.flush_sections()
+        await self.world.save_meta()
+        await self.world.save_manifest()
+        return result
+
     async def shutdown(self) -> None:
         logging.info('Shutting down...')
         if self.console_commands_task is not None:
@@ -384,6 +517,12 @@ class AsyncServer:
         if self.gc_task is not None:
             logging.debug('Cancelling backup GC task...')
             self.gc_task.cancel()
+        if self.save_task is not None:
+            logging.debug('Cancelling periodic save task...')
+            self.save_task.cancel()
+        if self.autosave_task is not None:
+            logging.debug('Cancelling player autosave task...')
+            self.autosave_task.cancel()
         logging.debug('Kicking clients...')
         message = translatable_text('server.closed')
         await asyncio.gather(*(client.disconnect(message) for client in self.clients))
@@ -400,6 +539,9 @@ class AsyncServer:
             self.singleplayer_pipe_out.close()
         if self.pipe_commands_task is not None:
             self.pipe_commands_task.cancel()
+        if self.chunk_generation_pool is not None:
+            logging.debug('Stopping chunk generation workers...')
+            self.chunk_generation_pool.close()
         if self.world is not None:
             logging.info('Saving world...')
             section_count = len(self.world.open_sections)
@@ -463,6 +605,31 @@ class AsyncServer:
         )
         await self.send_to_all(packet, cpos, exclude_player)
 
+    async def set_region_global(self,
+        x: int, y: int,
+        ids: npt.ArrayLike,
+        exclude_player: Optional[Client] = None
+    ) -> int:
+        """
+        Sets the block IDs of an area (see World.write_region) and sends one update per changed chunk to the clients
+        that have it loaded. Returns the number of blocks that changed (including ones that were only relit).
+        """
+        assert self.world is not None
+        changed = self.world.write_region(x, y, ids, self.world_generator)
+        block_count = 0
+        tasks: list[asyncio.Task[int]] = []
+        for (chunk, mask) in changed:
+            count = int(np.count_nonzero(mask))
+            block_count += count
+            packet: Packet
+            if count * 3 >= 1024:
+                packet = ChunkPacket(chunk) # Smaller than updating most of the chunk block by block
+            else:
+                packet = MultiChunkUpdatePacket.from_chunk(chunk, mask)
+            tasks.append(self.loop.create_task(self.send_to_all(packet, (chunk.abs_x, chunk.abs_y), exclude_player)))
+        await asyncio.gather(*tasks)
+        return block_count
+
     async def send_to_all(self,
         packet: Packet,
         cpos_only: Optional[tuple[int, int]] = None,
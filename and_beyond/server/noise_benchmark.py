@@ -0,0 +1,63 @@
+"""
+Compares the scalar and array versions of the Perlin noise functions used by world generation, and checks that they
+return exactly the same values. Run with `python -m and_beyond.server.noise_benchmark [--samples <count>]`.
+"""
+import random
+import time
+from typing import Callable
+
+import numpy as np
+
+from and_beyond.server.world_gen.perlin import FloatArray, PerlinNoise
+from and_beyond.utils import get_opt
+
+OCTAVES = 3
+
+
+def _time(fn: Callable[[], object]) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def benchmark(sample_count: int = 200000) -> None:
+    perlin = PerlinNoise(random.getrandbits(64))
+    xs = np.arange(-sample_count // 2, sample_count - sample_count // 2) / 150
+    ys = np.random.default_rng(0).uniform(-1000, 1000, sample_count)
+    x_list: list[float] = xs.tolist()
+    y_list: list[float] = ys.tolist()
+    cases: list[tuple[str, Callable[[], list[float]], Callable[[], FloatArray]]] = [
+        (
+            'noise_1d',
+            lambda: [perlin.noise_1d(x) for x in x_list],
+            lambda: perlin.noise_1d_array(xs),
+        ),
+        (
+            f'fbm_1d ({OCTAVES} octaves)',
+            lambda: [perlin.fbm_1d(x, OCTAVES) for x in x_list],
+            lambda: perlin.fbm_1d_array(xs, OCTAVES),
+        ),
+        (
+            f'fbm_2d ({OCTAVES} octaves)',
+            lambda: [perlin.fbm_2d(x, y, OCTAVES) for (x, y) in zip(x_list, y_list)],
+            lambda: perlin.fbm_2d_array(xs, ys, OCTAVES),
+        ),
+    ]
+    per_million = 1000000 / sample_count
+    print(f'Perlin noise over {sample_count} samples (seconds per million samples):')
+    for (name, scalar, array) in cases:
+        scalar_time, scalar_result = _time(scalar)
+        array_time, array_result = _time(array)
+        same = np.array_equal(np.array(scalar_result), array_result)
+        print(
+            f'  {name:<20} scalar {scalar_time * per_million:>8.3f} s, array {array_time * per_million:>8.3f} s '
+            f'({scalar_time / array_time:>6.1f}x), {"identical" if same else "DIFFERENT"}'
+        )
+
+
+if __name__ == '__main__':
+    try:
+        sample_count = int(get_opt('--samples'))
+    except (ValueError, IndexError):
+        sample_count = 200000
+    benchmark(sample_count)
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from and_beyond.server.world_tool import run_world_tool
+from and_beyond.world import World
+
+
+async def optimize_world(world: World, jobs: Optional[int]) -> int:
+    _, errors_count = await world.optimize_sections(jobs)
+    await world.save_manifest()
+    return 1 if errors_count else 0
+
+
+def main() -> None:
+    run_world_tool('Optimize', 'Optimizing', optimize_world)
+
+
+if __name__ == '__main__':
+    main()
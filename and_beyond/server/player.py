@@ -20,6 +20,12 @@ class Player(OfflinePlayer):
         self.physics = PlayerPhysics(self)
         self.loaded_chunks = client.loaded_chunks # Reference to fulfill AbstractPlayer
 
+    async def ainit(self) -> None:
+        await super().ainit()
+        if not self.stored:
+            # Players that joined are saved even if nothing changed, so that they have a record
+            self._saved_data = None
+
     async def move(self, x: float, y: float) -> None:
         self.x += x
         self.y += y
@@ -0,0 +1,36 @@
+import logging
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from and_beyond.blocks import BLOCKS
+from and_beyond.server.world_tool import run_world_tool
+from and_beyond.world import World, WorldChunk
+
+BlockCounts = npt.NDArray[np.int64]
+
+
+def count_blocks(chunk: WorldChunk) -> BlockCounts:
+    return np.bincount(chunk.get_tile_view().reshape(-1), minlength=256)
+
+
+async def scan_world(world: World, jobs: Optional[int]) -> int:
+    # The world may be running, so don't save anything
+    counts, chunk_count, errors_count = await world.scan_chunks(
+        count_blocks, np.add, np.zeros(256, np.int64), jobs
+    )
+    logging.info('Block counts across %i chunks:', chunk_count)
+    for (block_id, count) in enumerate(counts.tolist()):
+        if count:
+            block = BLOCKS[block_id]
+            logging.info('  %s: %i', block.name if block is not None else f'unknown ({block_id})', count)
+    return 1 if errors_count else 0
+
+
+def main() -> None:
+    run_world_tool('Scan', 'Scanning', scan_world)
+
+
+if __name__ == '__main__':
+    main()
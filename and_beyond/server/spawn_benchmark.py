@@ -0,0 +1,71 @@
+"""
+Compares the spawn search that starts from the generator's ground height estimate with the one that walks from y=0.
+Nothing is written to disk. Run with `python -m and_beyond.server.spawn_benchmark [--seeds <count>]`.
+"""
+import random
+import time
+from typing import Callable
+
+from and_beyond.server.world_gen.core import WorldGenerator
+from and_beyond.utils import get_opt
+from and_beyond.world import World, WorldChunk
+
+
+class _CountingGenerator(WorldGenerator):
+    generated_count: int
+
+    def __init__(self, seed: int) -> None:
+        super().__init__(seed)
+        self.generated_count = 0
+
+    def generate_chunk(self, chunk: WorldChunk) -> None:
+        self.generated_count += 1
+        super().generate_chunk(chunk)
+
+
+def _run_search(
+    seeds: list[int],
+    search: Callable[[World, int, WorldGenerator], tuple[int, int]]
+) -> tuple[float, int, list[tuple[int, int]]]:
+    elapsed = 0.0
+    generated_count = 0
+    results: list[tuple[int, int]] = []
+    for seed in seeds:
+        # A world that was never initialized has no sections, so every chunk is generated without being saved
+        world = World('spawn_benchmark')
+        gen = _CountingGenerator(seed)
+        x = random.Random(seed).randint(-128, 128)
+        start = time.perf_counter()
+        results.append(search(world, x, gen))
+        elapsed += time.perf_counter() - start
+        generated_count += gen.generated_count
+    return elapsed, generated_count, results
+
+
+def benchmark(seed_count: int = 100) -> None:
+    seeds = [random.Random(i).getrandbits(64) for i in range(seed_count)]
+    walk_time, walk_chunks, walk_results = _run_search(
+        seeds, lambda world, x, gen: world.get_closest_spawn(x, 0, gen)
+    )
+    estimate_time, estimate_chunks, estimate_results = _run_search(
+        seeds, lambda world, x, gen: world.search_spawn(x, gen)
+    )
+    print(f'Spawn search over {seed_count} seeds:')
+    print(
+        f'  Walk from y=0: {walk_time / seed_count * 1000:>8.3f} ms/search, '
+        f'{walk_chunks / seed_count:>5.1f} chunks generated/search'
+    )
+    print(
+        f'  From estimate: {estimate_time / seed_count * 1000:>8.3f} ms/search, '
+        f'{estimate_chunks / seed_count:>5.1f} chunks generated/search'
+    )
+    same_count = sum(a == b for (a, b) in zip(walk_results, estimate_results))
+    print(f'  Same location for {same_count}/{seed_count} seeds')
+
+
+if __name__ == '__main__':
+    try:
+        seed_count = int(get_opt('--seeds'))
+    except (ValueError, IndexError):
+        seed_count = 100
+    benchmark(seed_count)
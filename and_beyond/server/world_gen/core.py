@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from and_beyond.server.world_gen.phase import AbstractPhase
 from and_beyond.server.world_gen.phases.caves import CavePhase
@@ -12,14 +12,16 @@ if TYPE_CHECKING:
 class WorldGenerator:
     seed: int
     ground: GroundPhase
+    caves: CavePhase
     phases: list[AbstractPhase]
 
     def __init__(self, seed: int) -> None:
         self.seed = seed
         self.ground = GroundPhase(self)
+        self.caves = CavePhase(self)
         self.phases = [
             self.ground,
-            CavePhase(self),
+            self.caves,
             SkyIslandsPhase(self),
             TreeDecorationPhase(self),
         ]
@@ -27,3 +29,28 @@ class WorldGenerator:
     def generate_chunk(self, chunk: 'WorldChunk') -> None:
         for phase in self.phases:
             phase.generate_chunk(chunk)
+
+    def generate_chunks(self, chunks: Iterable['WorldChunk']) -> None:
+        """
+        Generates several chunks at once. The chunks are grouped into chunk columns, and each phase generates a whole
+        column at a time (see AbstractPhase.generate_chunks), so work shared by a column is only done once. The result
+        is the same as calling generate_chunk for each chunk.
+        """
+        columns: dict[int, list['WorldChunk']] = {}
+        for chunk in chunks:
+            columns.setdefault(chunk.abs_x, []).append(chunk)
+        for column in columns.values():
+            column.sort(key=lambda chunk: chunk.abs_y)
+            for phase in self.phases:
+                phase.generate_chunks(column)
+
+    def get_ground_height(self, x: int) -> int:
+        """
+        Returns the height of the highest ground block at x from the ground heightmap and the cave noise, without
+        generating any chunks. Sky islands are always far above the ground, so they're ignored. Trees aren't taken into
+        account.
+        """
+        y = self.ground.get_height(x)
+        while self.caves.is_carved(x, y):
+            y -= 1
+        return y
@@ -1,6 +1,9 @@
 import math
 import random
-from typing import Callable, Optional
+from typing import Callable, Optional, TypeVar
+
+import numpy as np
+import numpy.typing as npt
 
 
 PERM = [
@@ -21,8 +24,18 @@ PERM = [
 ]
 
 
+FloatArray = npt.NDArray[np.float64]
+
+_F = TypeVar('_F', float, FloatArray)
+
+
 class PerlinNoise:
+    """
+    Perlin noise with scalar and array versions of each function. The array versions do the same floating point
+    operations in the same order as the scalar ones, so they return exactly the same values.
+    """
     perm: list[int]
+    perm_array: npt.NDArray[np.int64]
 
     def __init__(self, seed: Optional[int] = None) -> None:
         if seed is None:
@@ -32,6 +45,7 @@ class PerlinNoise:
             r = random.Random(seed)
             r.shuffle(p)
             self.perm = p
+        self.perm_array = np.array(self.perm, np.int64)
 
     def noise_1d(self, x: float) -> float:
         x2 = int(x) & 0xff
@@ -57,6 +71,40 @@ class PerlinNoise:
     def fbm_2d(self, x: float, y: float, octave: int) -> float:
         return self._fbm(self.noise_2d, octave, x, y)
 
+    def noise_1d_array(self, x: npt.ArrayLike) -> FloatArray:
+        xs = np.asarray(x, np.float64)
+        # int() truncates towards zero, unlike floor
+        x2 = np.trunc(xs).astype(np.int64) & 0xff
+        xs = xs - np.floor(xs)
+        u = self._fade(xs)
+        perm = self.perm_array
+        return self._lerp(u, self._grad_1d_array(perm[x2], xs), self._grad_1d_array(perm[x2 + 1], xs - 1)) * 2
+
+    def noise_2d_array(self, x: npt.ArrayLike, y: npt.ArrayLike) -> FloatArray:
+        xs, ys = np.broadcast_arrays(np.asarray(x, np.float64), np.asarray(y, np.float64))
+        x2 = np.trunc(xs).astype(np.int64) & 0xff
+        y2 = np.trunc(ys).astype(np.int64) & 0xff
+        xs = xs - np.floor(xs)
+        ys = ys - np.floor(ys)
+        u = self._fade(xs)
+        v = self._fade(ys)
+        perm = self.perm_array
+        a = (perm[x2] + y2) & 0xff
+        b = (perm[x2 + 1] + y2) & 0xff
+        return self._lerp(
+            v,
+            self._lerp(u, self._grad_2d_array(perm[a], xs, ys), self._grad_2d_array(perm[b], xs - 1, ys)),
+            self._lerp(
+                u, self._grad_2d_array(perm[a + 1], xs, ys - 1), self._grad_2d_array(perm[b + 1], xs - 1, ys - 1)
+            )
+        )
+
+    def fbm_1d_array(self, x: npt.ArrayLike, octave: int) -> FloatArray:
+        return self._fbm_array(self.noise_1d_array, octave, x)
+
+    def fbm_2d_array(self, x: npt.ArrayLike, y: npt.ArrayLike, octave: int) -> FloatArray:
+        return self._fbm_array(self.noise_2d_array, octave, x, y)
+
     def _fbm(self, noise_function: Callable[..., float], octave: int, *coords: float) -> float:
         coords_l = list(coords)
         f = 0.0
@@ -68,10 +116,21 @@ class PerlinNoise:
             w *= 0.5
         return f
 
-    def _fade(self, t: float) -> float:
+    def _fbm_array(self, noise_function: Callable[..., FloatArray], octave: int, *coords: npt.ArrayLike) -> FloatArray:
+        coords_l = list(np.broadcast_arrays(*(np.asarray(coord, np.float64) for coord in coords)))
+        f = np.zeros(coords_l[0].shape)
+        w = 0.5
+        for i in range(octave):
+            f += w * noise_function(*coords_l)
+            for j in range(len(coords_l)):
+                coords_l[j] = coords_l[j] * 2.0
+            w *= 0.5
+        return f
+
+    def _fade(self, t: _F) -> _F:
         return t * t * t * (t * (t * 6 - 15) + 10)
 
-    def _lerp(self, t: float, a: float, b: float) -> float:
+    def _lerp(self, t: _F, a: _F, b: _F) -> _F:
         return a + t * (b - a)
 
     def _grad_1d(self, hash: int, x: float) -> float:
@@ -79,3 +138,9 @@ class PerlinNoise:
 
     def _grad_2d(self, hash: int, x: float, y: float) -> float:
         return (x if (hash & 1) else -x) + (y if (hash & 2) else -y)
+
+    def _grad_1d_array(self, hash: npt.NDArray[np.int64], x: FloatArray) -> FloatArray:
+        return np.where(hash & 1, x, -x)
+
+    def _grad_2d_array(self, hash: npt.NDArray[np.int64], x: FloatArray, y: FloatArray) -> FloatArray:
+        return np.where(hash & 1, x, -x) + np.where(hash & 2, y, -y)
@@ -2,12 +2,17 @@ import abc
 import sys
 from typing import TYPE_CHECKING
 
+import numpy as np
+import numpy.typing as npt
 
 if TYPE_CHECKING:
     from and_beyond.server.world_gen.core import WorldGenerator
     from and_beyond.world import WorldChunk
 
 DEFAULT_HEIGHTMAP = sys.intern('DEFAULT')
+HEIGHTMAP_CACHE_SIZE = 4096 # Chunk columns per heightmap
+
+HeightArray = npt.NDArray[np.int64]
 
 
 class AbstractPhase(abc.ABC):
@@ -20,22 +25,72 @@ class AbstractPhase(abc.ABC):
     def generate_chunk(self, chunk: 'WorldChunk') -> None:
         raise NotImplementedError
 
+    def generate_chunks(self, chunks: list['WorldChunk']) -> None:
+        """
+        Generates chunks that are all in the same chunk column, sorted from bottom to top. Phases can override this to
+        share work between the chunks; by default each chunk is generated on its own.
+        """
+        for chunk in chunks:
+            self.generate_chunk(chunk)
+
 
 class HeightmappedPhase(AbstractPhase):
-    heightmaps: dict[str, dict[int, int]]
+    """
+    A phase that generates from one or more heightmaps. Heights are computed for a whole chunk column (16 columns) at a
+    time, and each heightmap caches the heights of the most recently used `max_cached_columns` chunk columns.
+    """
+    heightmaps: dict[str, dict[int, HeightArray]]
+    max_cached_columns: int
+    heightmap_hits: int
+    heightmap_misses: int
+    _last_columns: dict[str, tuple[int, list[int]]]
 
-    def __init__(self, generator: 'WorldGenerator') -> None:
+    def __init__(self, generator: 'WorldGenerator', max_cached_columns: int = HEIGHTMAP_CACHE_SIZE) -> None:
         super().__init__(generator)
         self.heightmaps = {DEFAULT_HEIGHTMAP: {}}
+        self.max_cached_columns = max_cached_columns
+        self.heightmap_hits = 0
+        self.heightmap_misses = 0
+        self._last_columns = {}
 
     @abc.abstractmethod
     def _get_height(self, x: int, heightmap: str) -> int:
         raise NotImplementedError
 
+    def _get_heights(self, xs: HeightArray, heightmap: str) -> HeightArray:
+        """Like _get_height for every x in `xs`. Phases can override this with a vectorized version."""
+        return np.array([self._get_height(x, heightmap) for x in xs.tolist()], np.int64)
+
     def get_height(self, x: int, heightmap_name: str = DEFAULT_HEIGHTMAP) -> int:
-        heightmap = self.heightmaps.setdefault(heightmap_name, {})
-        height = heightmap.get(x)
-        if height is None:
-            height = self._get_height(x, heightmap_name)
-            heightmap[x] = height
-        return height
+        chunk_x = x >> 4
+        # Lookups by x tend to walk along one chunk column, so the heights of the last one are kept as a list too
+        last_column = self._last_columns.get(heightmap_name)
+        if last_column is not None and last_column[0] == chunk_x:
+            self.heightmap_hits += 1
+            return last_column[1][x & 15]
+        heights = self.get_heights(chunk_x, heightmap_name).tolist()
+        self._last_columns[heightmap_name] = (chunk_x, heights)
+        return heights[x & 15]
+
+    def get_heights(self, chunk_x: int, heightmap_name: str = DEFAULT_HEIGHTMAP) -> HeightArray:
+        """Returns the heights of the 16 columns in the chunk column `chunk_x`. The returned array is read-only."""
+        heightmap = self.heightmaps.get(heightmap_name)
+        if heightmap is None:
+            heightmap = self.heightmaps[heightmap_name] = {}
+        heights = heightmap.get(chunk_x)
+        if heights is None:
+            self.heightmap_misses += 1
+            x = chunk_x << 4
+            heights = self._get_heights(np.arange(x, x + 16, dtype=np.int64), heightmap_name)
+            heights.flags.writeable = False
+            if len(heightmap) >= self.max_cached_columns:
+                del heightmap[next(iter(heightmap))]
+            heightmap[chunk_x] = heights
+        else:
+            self.heightmap_hits += 1
+            # Move it to the end to mark it as the most recently used, unless it already is (lookups tend to repeat the
+            # same column many times in a row)
+            if next(reversed(heightmap)) != chunk_x:
+                del heightmap[chunk_x]
+                heightmap[chunk_x] = heights
+        return heights
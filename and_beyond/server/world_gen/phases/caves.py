@@ -1,6 +1,8 @@
 import random
 from typing import TYPE_CHECKING
 
+import numpy as np
+import numpy.typing as npt
 from opensimplex import OpenSimplex
 
 from and_beyond import blocks
@@ -27,26 +29,70 @@ class CavePhase(AbstractPhase):
     def noise(self, x: float, y: float) -> float:
         return sum(self.simplex.noise2(2 ** i * x, 2 ** i * y) ** 2 for i in range(OCTAVES))
 
+    def noise_array(self, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """Returns noise(x[i], y[j]) at [i, j], with exactly the same values as noise."""
+        result = np.zeros((x.size, y.size))
+        for i in range(OCTAVES):
+            # noise2array is indexed by y first
+            result += self.simplex.noise2array(2 ** i * x, 2 ** i * y).T ** 2
+        return result
+
+    def _get_chunk_random(self, x: int, y: int) -> random.Random:
+        return random.Random((((self.generator.seed << 32) + x) << 32) + y)
+
+    def is_carved(self, x: int, y: int) -> bool:
+        """
+        Returns whether the ground block at (x, y) is carved out, without generating the chunk. Dirt and grass are only
+        carved out depending on the chunk's random numbers, so those are replayed in the same order as generate_chunk.
+        """
+        if (y >> 4) > -5:
+            return False
+        ground = self.generator.ground
+        height = ground.get_height(x)
+        if y > height:
+            return False # Air
+        if height - y < 4:
+            cx = x & ~15
+            cy = y & ~15
+            # Every dirt and grass block before this one in the chunk takes one random number
+            draws = 0
+            for column_x in range(cx, x + 1):
+                column_height = ground.get_height(column_x)
+                top = min(column_height, cy + 15 if column_x < x else y - 1)
+                draws += max(top - max(column_height - 3, cy) + 1, 0)
+            rand = self._get_chunk_random(x >> 4, y >> 4)
+            for _ in range(draws):
+                rand.random()
+            if rand.random() < 0.1:
+                return False
+        return self.noise(x / X_SCALE, y / Y_SCALE) + Y_OFFSET <= BOUND
+
     def generate_chunk(self, chunk: 'WorldChunk') -> None:
-        if chunk.abs_y > -5:
-            return
-        cx = chunk.abs_x << 4
-        cy = chunk.abs_y << 4
-        rand = random.Random((((self.generator.seed << 32) + chunk.abs_x) << 32) + chunk.abs_y)
-        for x in range(16):
-            for y in range(16):
-                old_block = chunk.get_tile_type(x, y)
-                if old_block == blocks.AIR:
-                    continue
-                if old_block in (blocks.DIRT, blocks.GRASS) and rand.random() < 0.1:
-                    continue
-                abs_x = cx + x
-                abs_y = cy + y
-                noise = self.noise(abs_x / X_SCALE, abs_y / Y_SCALE) + Y_OFFSET
-                if noise > BOUND:
-                    continue
-                chunk.set_tile_type_no_event(x, y, blocks.AIR)
+        self.generate_chunks([chunk])
 
+    def generate_chunks(self, chunks: list['WorldChunk']) -> None:
+        chunks = [chunk for chunk in chunks if chunk.abs_y <= -5 and (chunk.get_tile_view() != blocks.AIR.id).any()]
+        if not chunks:
+            return
+        cx = chunks[0].abs_x << 4
+        # One noise evaluation for the whole column, indexed as [x, y]
+        abs_y = (np.array([chunk.abs_y << 4 for chunk in chunks])[:, np.newaxis] + np.arange(16)).ravel()
+        noise = self.noise_array(np.arange(cx, cx + 16) / X_SCALE, abs_y / Y_SCALE) + Y_OFFSET
+        for (i, chunk) in enumerate(chunks):
+            self._carve(chunk, noise[:, i * 16:(i + 1) * 16])
+
+    def _carve(self, chunk: 'WorldChunk', noise: npt.NDArray[np.float64]) -> None:
+        ids = chunk.get_tile_view()
+        solid = ids != blocks.AIR.id
+        # Every dirt and grass block takes one random number, in the same x-major order as the tile array
+        soil = (ids == blocks.DIRT.id) | (ids == blocks.GRASS.id)
+        rand = self._get_chunk_random(chunk.abs_x, chunk.abs_y)
+        exempt = np.zeros((16, 16), bool)
+        exempt[soil] = np.array([rand.random() for _ in range(np.count_nonzero(soil))]) < 0.1
+        carved = solid & ~exempt & (noise <= BOUND)
+        if carved.any():
+            ids[carved] = blocks.AIR.id
+            chunk.mark_dirty()
 
 def test() -> None:
     from types import SimpleNamespace
@@ -1,8 +1,10 @@
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from and_beyond import blocks
 from and_beyond.server.world_gen.perlin import PerlinNoise
-from and_beyond.server.world_gen.phase import HeightmappedPhase
+from and_beyond.server.world_gen.phase import HeightArray, HeightmappedPhase
 from and_beyond.world import WorldChunk
 
 if TYPE_CHECKING:
@@ -24,22 +26,24 @@ class GroundPhase(HeightmappedPhase):
     def _get_height(self, x: int, heightmap: str) -> int:
         return int(self.perlin.fbm_1d(x / X_SCALE, OCTAVES) * Y_SCALE + Y_OFFSET)
 
+    def _get_heights(self, xs: HeightArray, heightmap: str) -> HeightArray:
+        # Casting truncates towards zero, like int()
+        return (self.perlin.fbm_1d_array(xs / X_SCALE, OCTAVES) * Y_SCALE + Y_OFFSET).astype(np.int64)
+
     def generate_chunk(self, chunk: 'WorldChunk') -> None:
-        if chunk.abs_y > 6:
+        self.generate_chunks([chunk])
+
+    def generate_chunks(self, chunks: list['WorldChunk']) -> None:
+        chunks = [chunk for chunk in chunks if chunk.abs_y <= 6]
+        if not chunks:
             return
-        cx = chunk.abs_x << 4
-        cy = chunk.abs_y << 4
-        for x in range(16):
-            abs_x = cx + x
-            height = self.get_height(abs_x)
-            for y in range(16):
-                abs_y = cy + y
-                if abs_y > height:
-                    type = blocks.AIR
-                elif abs_y == height:
-                    type = blocks.GRASS
-                elif height - abs_y < 4:
-                    type = blocks.DIRT
-                else:
-                    type = blocks.STONE
-                chunk.set_tile_type_no_event(x, y, type)
+        heights = self.get_heights(chunks[0].abs_x)[np.newaxis, :, np.newaxis]
+        # abs_y is indexed as [chunk, x, y]
+        abs_y = np.array([chunk.abs_y << 4 for chunk in chunks])[:, np.newaxis, np.newaxis] + np.arange(16)
+        ids = np.select(
+            [abs_y > heights, abs_y == heights, heights - abs_y < 4],
+            [blocks.AIR.id, blocks.GRASS.id, blocks.DIRT.id],
+            blocks.STONE.id
+        )
+        for (chunk, chunk_ids) in zip(chunks, ids):
+            chunk.set_tile_ids(chunk_ids)
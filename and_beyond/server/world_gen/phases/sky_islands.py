@@ -2,9 +2,11 @@ import random
 import sys
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from and_beyond import blocks
 from and_beyond.server.world_gen.perlin import PerlinNoise
-from and_beyond.server.world_gen.phase import HeightmappedPhase
+from and_beyond.server.world_gen.phase import HeightArray, HeightmappedPhase
 from and_beyond.world import WorldChunk
 
 if TYPE_CHECKING:
@@ -34,26 +36,32 @@ class SkyIslandsPhase(HeightmappedPhase):
             return int(self.perlin.fbm_1d(x / X_SCALE_ISLAND, OCTAVES) * Y_SCALE_ISLAND)
         return int(self.perlin.noise_1d(x / X_SCALE_SURFACE) * Y_SCALE_SURFACE + Y_OFFSET_SURFACE)
 
+    def _get_heights(self, xs: HeightArray, heightmap: str) -> HeightArray:
+        # Casting truncates towards zero, like int()
+        if heightmap == ISLAND_HEIGHTMAP:
+            return (self.perlin.fbm_1d_array(xs / X_SCALE_ISLAND, OCTAVES) * Y_SCALE_ISLAND).astype(np.int64)
+        return (
+            self.perlin.noise_1d_array(xs / X_SCALE_SURFACE) * Y_SCALE_SURFACE + Y_OFFSET_SURFACE
+        ).astype(np.int64)
+
     def generate_chunk(self, chunk: 'WorldChunk') -> None:
         if chunk.abs_y < 24 or chunk.abs_y > 36:
             return
-        cx = chunk.abs_x << 4
         cy = chunk.abs_y << 4
-        for x in range(16):
-            abs_x = cx + x
-            island_height = self.get_height(abs_x, ISLAND_HEIGHTMAP)
-            surface_height = self.get_height(abs_x)
-            island_height += Y_OFFSET_ISLAND
-            if island_height > surface_height:
-                continue
-            for y in range(16):
-                abs_y = cy + y
-                if abs_y > surface_height or abs_y < island_height:
-                    type = blocks.AIR
-                elif abs_y == surface_height:
-                    type = blocks.GRASS
-                elif surface_height - abs_y < 4:
-                    type = blocks.DIRT
-                else:
-                    type = blocks.STONE
-                chunk.set_tile_type_no_event(x, y, type)
+        island_heights = self.get_heights(chunk.abs_x, ISLAND_HEIGHTMAP)[:, np.newaxis] + Y_OFFSET_ISLAND
+        surface_heights = self.get_heights(chunk.abs_x)[:, np.newaxis]
+        columns = (island_heights <= surface_heights)[:, 0]
+        if not columns.any():
+            return
+        abs_y = np.arange(cy, cy + 16)[np.newaxis, :]
+        ids = np.select(
+            [
+                (abs_y > surface_heights) | (abs_y < island_heights),
+                abs_y == surface_heights,
+                surface_heights - abs_y < 4,
+            ],
+            [blocks.AIR.id, blocks.GRASS.id, blocks.DIRT.id],
+            blocks.STONE.id
+        )
+        chunk.get_tile_view()[columns] = ids[columns]
+        chunk.mark_dirty()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from and_beyond.server.world_gen.core import WorldGenerator
+from and_beyond.world import CHUNK_VERSION, WorldChunk
+
+LATENCY_SAMPLES = 100
+
+_generator: Optional[WorldGenerator] = None
+
+
+def _init_worker(seed: int) -> None:
+    global _generator
+    _generator = WorldGenerator(seed)
+
+
+def generate_chunk_data(positions: list[tuple[int, int]]) -> list[bytes]:
+    """Generates the chunks at `positions` in a worker process, and returns the data of each of them."""
+    assert _generator is not None
+    chunks = [WorldChunk.virtual_chunk(x & 15, y & 15, x, y, bytearray(1024)) for (x, y) in positions]
+    _generator.generate_chunks(chunks)
+    for chunk in chunks:
+        chunk.version = CHUNK_VERSION
+    return [bytes(chunk.fp) for chunk in chunks]
+
+
+class ChunkGenerationPool:
+    """
+    Generates chunks in worker processes, so that generation doesn't block the event loop. Requests for a chunk that is
+    already being generated share the same result. Requests made during the same event loop iteration are sent to the
+    workers together, one chunk column per job (see WorldGenerator.generate_chunks).
+    """
+    executor: ProcessPoolExecutor
+    loop: asyncio.AbstractEventLoop
+    closed: bool
+    in_flight: dict[tuple[int, int], asyncio.Future[bytes]]
+    _pending: list[tuple[int, int]]
+    _submit_handle: Optional[asyncio.Handle]
+    _request_times: dict[tuple[int, int], float]
+    latencies: deque[float]
+    request_count: int
+    shared_count: int
+    generated_count: int
+
+    def __init__(self, seed: int, workers: Optional[int] = None) -> None:
+        # Forked workers would inherit the locks of the server's threads, such as the one held by the console reader,
+        # and could deadlock on them
+        self.executor = ProcessPoolExecutor(
+            workers, multiprocessing.get_context('spawn'), initializer=_init_worker, initargs=(seed,)
+        )
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        self.in_flight = {}
+        self._pending = []
+        self._submit_handle = None
+        self._request_times = {}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.request_count = 0
+        self.shared_count = 0
+        self.generated_count = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.in_flight)
+
+    @property
+    def mean_latency(self) -> float:
+        """The mean time taken to generate the last few chunks, in seconds."""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def generate(self, x: int, y: int) -> 'asyncio.Future[bytes]':
+        """Returns a future for the data of the chunk at (x, y) once it's generated."""
+        self.request_count += 1
+        future = self.in_flight.get((x, y))
+        if future is not None:
+            self.shared_count += 1
+            return future
+        future = self.loop.create_future()
+        self.in_flight[(x, y)] = future
+        self._request_times[(x, y)] = time.perf_counter()
+        self._pending.append((x, y))
+        if self._submit_handle is None:
+            self._submit_handle = self.loop.call_soon(self._submit)
+        return future
+
+    def _submit(self) -> None:
+        self._submit_handle = None
+        columns: dict[int, list[tuple[int, int]]] = {}
+        for pos in self._pending:
+            columns.setdefault(pos[0], []).append(pos)
+        self._pending.clear()
+        for positions in columns.values():
+            job = self.executor.submit(generate_chunk_data, positions)
+            job.add_done_callback(lambda job, positions=positions: self._job_done(positions, job))
+
+    def _job_done(self, positions: list[tuple[int, int]], job: 'Future[list[bytes]]') -> None:
+        # Called from the executor's thread
+        if not self.closed and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._finish, positions, job)
+
+    def _finish(self, positions: list[tuple[int, int]], job: 'Future[list[bytes]]') -> None:
+        if self.closed:
+            return
+        end = time.perf_counter()
+        try:
+            results = job.result()
+        except Exception as e:
+            logging.error('Failed to generate chunks %s', positions, exc_info=True)
+            for pos in positions:
+                self._request_times.pop(pos, None)
+                future = self.in_flight.pop(pos)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (pos, data) in zip(positions, results):
+            self.latencies.append(end - self._request_times.pop(pos))
+            future = self.in_flight.pop(pos)
+            if not future.done():
+                future.set_result(data)
+        self.generated_count += len(positions)
+
+    def close(self) -> None:
+        self.closed = True
+        if self._submit_handle is not None:
+            self._submit_handle.cancel()
+            self._submit_handle = None
+        for future in self.in_flight.values():
+            future.cancel()
+        self.in_flight.clear()
+        self._request_times.clear()
+        self._pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
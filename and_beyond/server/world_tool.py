@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import sys
+import threading
+from typing import Awaitable, Callable, Optional
+
+from and_beyond.utils import get_opt, init_logger
+from and_beyond.world import World
+
+WorldTool = Callable[[World, Optional[int]], Awaitable[int]]
+
+
+async def open_world(world_name: str, action: str) -> Optional[World]:
+    """
+    Opens a world for a command line tool, and rebuilds its manifest from the section files. Returns None if the world
+    doesn't exist.
+    """
+    world = World(world_name)
+    if not world.sections_path.is_dir():
+        logging.critical('World "%s" does not exist', world_name)
+        return None
+    logging.info('%s world "%s"', action, world_name)
+    # The world may be running or may not have been closed cleanly, so the files on disk are authoritative
+    await world.rebuild_manifest()
+    return world
+
+
+async def _run_world_tool(tool: WorldTool, action: str, world_name: str, jobs: Optional[int]) -> int:
+    world = await open_world(world_name, action)
+    if world is None:
+        return 1
+    return await tool(world, jobs)
+
+
+def run_world_tool(name: str, action: str, tool: WorldTool) -> None:
+    """
+    Runs `tool` on the world given by `--world` (`world` by default) with the number of processes given by `--jobs` (one
+    per CPU core by default), and exits with the status code it returns.
+    """
+    threading.current_thread().name = f'{name}Thread'
+    init_logger(f'{name.lower()}.log')
+    try:
+        world_name = get_opt('--world')
+    except (ValueError, IndexError):
+        world_name = 'world'
+    try:
+        jobs = int(get_opt('--jobs'))
+    except (ValueError, IndexError):
+        jobs = None
+    sys.exit(asyncio.run(_run_world_tool(tool, action, world_name, jobs)))
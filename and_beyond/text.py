@@ -21,6 +21,7 @@ _available_fallback_languages: dict[str, TranslateMapping] = {'en': EN_US}
 
 
 class Text:
+    __slots__ = ('value', 'localized', 'format_args', 'format_kwargs')
     value: str
     localized: bool
     format_args: tuple[FormatValueType, ...]
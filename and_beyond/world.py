@@ -1,32 +1,57 @@
 import abc
 import asyncio
 import enum
+import itertools
 import json
 import logging
+import os
 import random
+import struct
+import threading
 import time
+import zlib
 from asyncio.events import AbstractEventLoop
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 from json.decoder import JSONDecodeError
-from mmap import ACCESS_WRITE, mmap
+from mmap import ACCESS_WRITE, ALLOCATIONGRANULARITY, mmap
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Awaitable, ByteString, Callable, Optional, TypedDict, Union
+from typing import TYPE_CHECKING, Any, ByteString, Callable, Iterable, Iterator, Optional, TypedDict, TypeVar, Union
 from uuid import UUID
 
 import aiofiles
+import numpy as np
+import numpy.typing as npt
 from typing_extensions import Self
 
 from and_beyond import blocks
 from and_beyond.abstract_player import AbstractPlayer, PlayerInventory
 from and_beyond.blocks import Block, get_block_by_id
+from and_beyond.player_store import JsonPlayerStore, PlayerData, PlayerStore, SqlitePlayerStore
 from and_beyond.text import Text
 
 if TYPE_CHECKING:
     from and_beyond.server.world_gen.core import WorldGenerator
+    from and_beyond.server.world_gen.pool import ChunkGenerationPool
 
 ALLOWED_FILE_CHARS = ' ._'
-DATA_VERSION = 2
+DATA_VERSION = 6
+SECTION_HEADER_SIZE = 2606
+SECTION_EXTENT_SIZE = 16 * 1024
+RECORD_ALIGNMENT = 64
+EMPTY_CHUNK = bytes(1024)
+MAX_OPEN_SECTIONS = 512
+MAX_MAPPED_BYTES = 256 * 1024 * 1024
+CHUNK_CACHE_SIZE = 8
+PLAYER_CACHE_SIZE = 1024
+SECTION_MANIFEST_VERSION = 1
+SCAN_READ_ATTEMPTS = 3
+
+ChunkArray = npt.NDArray[np.uint8]
+
+_CHUNK_ENTRY = struct.Struct('<IHH')
+_EMPTY_HEIGHTMAP = b'\xff' * 512
+_T = TypeVar('_T')
 
 
 def safe_filename(name: str) -> str:
@@ -39,10 +64,240 @@ def safe_filename(name: str) -> str:
     )
 
 
+def _get_palette_bits(palette_size: int) -> int:
+    if palette_size == 1:
+        return 0
+    if palette_size == 2:
+        return 1
+    if palette_size <= 4:
+        return 2
+    if palette_size <= 16:
+        return 4
+    return 8
+
+
+def _get_reserved_size(length: int) -> int:
+    return (length + RECORD_ALIGNMENT - 1) // RECORD_ALIGNMENT * RECORD_ALIGNMENT
+
+
+def encode_chunk_data(data: ByteString) -> bytes:
+    """
+    Encodes 1024 bytes of chunk data into a compressed record. The record is a zlib stream containing:
+        0:1   -- The number of distinct block types in the chunk minus one (UINT1)
+        1:n   -- The palette, with one block type (UINT1) per entry
+        n:m   -- The block types as palette indices in `x * 16 + y` order. Each index is packed into 0, 1, 2, 4, or 8
+                 bits (the smallest that fits the palette), starting from the lowest bits of each byte.
+        m:end -- The block metadata bytes in `x * 16 + y` order, followed by bytes 512:1024 of the chunk data
+    """
+    raw = np.frombuffer(data, np.uint8, 1024)
+    palette, indices = np.unique(raw[0:512:2], return_inverse=True)
+    bits = _get_palette_bits(len(palette))
+    if bits:
+        per_byte = 8 // bits
+        shifts = np.arange(0, 8, bits, dtype=np.uint8)
+        packed = np.bitwise_or.reduce(indices.astype(np.uint8).reshape(-1, per_byte) << shifts, axis=1)
+        packed_bytes = packed.astype(np.uint8).tobytes()
+    else:
+        packed_bytes = b''
+    return zlib.compress(
+        bytes((len(palette) - 1,)) + palette.tobytes() + packed_bytes + raw[1:512:2].tobytes() + raw[512:].tobytes()
+    )
+
+
+def decode_chunk_data(record: ByteString) -> bytearray:
+    raw = zlib.decompress(record)
+    palette_size = raw[0] + 1
+    palette = np.frombuffer(raw, np.uint8, palette_size, 1)
+    bits = _get_palette_bits(palette_size)
+    addr = 1 + palette_size
+    if bits:
+        packed = np.frombuffer(raw, np.uint8, 32 * bits, addr)
+        shifts = np.arange(0, 8, bits, dtype=np.uint8)
+        indices = ((packed[:, np.newaxis] >> shifts) & ((1 << bits) - 1)).reshape(-1)
+        addr += 32 * bits
+    else:
+        indices = np.zeros(256, np.uint8)
+    data = bytearray(1024)
+    blocks_view = np.frombuffer(data, np.uint8, 512).reshape(256, 2)
+    blocks_view[:, 0] = palette[indices]
+    blocks_view[:, 1] = np.frombuffer(raw, np.uint8, 256, addr)
+    data[512:] = raw[addr + 256:addr + 768]
+    return data
+
+
+def _parse_section_version(header: bytes) -> int:
+    if not header[:10].strip(b'\0'):
+        return 0
+    if header[:6] != b'BEYOND':
+        raise SectionFormatError('Magic mismatch')
+    return int.from_bytes(header[6:10], 'little', signed=False)
+
+
+def _count_present_chunks(version: int, bitmask: ByteString) -> Optional[int]:
+    if version < 2:
+        return None # Version 1 sections have no presence bitmask
+    return bin(int.from_bytes(bitmask, 'little', signed=False)).count('1')
+
+
+def get_uniform_chunk(data: ByteString) -> Optional[tuple[int, int]]:
+    """
+    If the chunk data is made up of a single block type and nothing else (besides the chunk data version), returns the
+    block type and the chunk data version. Otherwise, returns None.
+    """
+    block_id = data[0]
+    if data[:512] != bytes((block_id, 0)) * 256 or data[516:] != EMPTY_CHUNK[516:]:
+        return None
+    return block_id, int.from_bytes(data[512:516], 'little', signed=False)
+
+
+def make_uniform_chunk(block_id: int, version: int) -> bytearray:
+    data = bytearray(bytes((block_id, 0)) * 256)
+    data += version.to_bytes(4, 'little', signed=False)
+    data += EMPTY_CHUNK[516:]
+    return data
+
+
+def read_section_version(path: Path) -> int:
+    """Reads the format version of a section file from its header, without mapping the rest of the file."""
+    with open(path, 'rb') as fp:
+        return _parse_section_version(fp.read(10))
+
+
+def read_section_info(x: int, y: int, path: Path) -> 'SectionInfo':
+    """Reads the manifest entry for a section file from its header, without mapping the rest of the file."""
+    with open(path, 'rb') as fp:
+        header = fp.read(42)
+        size = fp.seek(0, 2)
+    version = _parse_section_version(header)
+    return {
+        'x': x,
+        'y': y,
+        'version': version,
+        'chunk_count': _count_present_chunks(version, header[10:42]),
+        'size': size,
+    }
+
+
+def optimize_section(world_name: str, x: int, y: int) -> bool:
+    """Optimizes a single section. This is run in worker processes by World.optimize_sections."""
+    section = WorldSection(World(world_name), x, y, optimize=False)
+    try:
+        return section.optimize()
+    finally:
+        section.close()
+
+
+def compact_section_file(path: Path) -> Optional[tuple[int, int, tuple[int, int]]]:
+    """
+    Writes a compacted copy of a section file to `<path>.compact`, with the records in chunk offset table order and
+    without any unused space. This is run in worker processes by World.compact_sections. Returns the size of the
+    original file, the size of the copy, and the (mtime, size) of the original file when it was read. If the section
+    is already compact, nothing is written and None is returned.
+    """
+    with open(path, 'rb') as fp:
+        stat = os.fstat(fp.fileno())
+        data = fp.read()
+    version = _parse_section_version(data)
+    if version != DATA_VERSION:
+        raise SectionFormatError(f'Section must be optimized before compacting ({version} != {DATA_VERSION})')
+    header = bytearray(data[:SECTION_HEADER_SIZE])
+    present = int.from_bytes(header[10:42], 'little', signed=False)
+    records = bytearray()
+    new_addr = SECTION_HEADER_SIZE
+    for idx in range(256):
+        if not (present >> idx) & 1:
+            continue
+        address, length, _ = _CHUNK_ENTRY.unpack_from(data, 42 + idx * 8)
+        if length == 0:
+            continue # Uniform chunks have no record
+        reserved = _get_reserved_size(length)
+        _CHUNK_ENTRY.pack_into(header, 42 + idx * 8, new_addr, length, reserved)
+        records += data[address:address + length].ljust(reserved, b'\0')
+        new_addr += reserved
+    header[2090:2094] = new_addr.to_bytes(4, 'little', signed=False)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    if header == data[:SECTION_HEADER_SIZE] and new_addr == len(data):
+        return None # The records are already laid out like this
+    with open(path.with_name(path.name + '.compact'), 'wb') as fp:
+        fp.write(header)
+        fp.write(records)
+        fp.flush()
+        os.fsync(fp.fileno())
+    return len(data), new_addr, stat_key
+
+
+def _read_section_chunk_data(path: Path) -> Optional[list[tuple[int, int, bytearray]]]:
+    """Returns None if a record couldn't be read, which happens if the chunk was being written at the same time."""
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    version = _parse_section_version(data)
+    if version != DATA_VERSION:
+        raise SectionFormatError(f'Section must be optimized before scanning ({version} != {DATA_VERSION})')
+    present = int.from_bytes(data[10:42], 'little', signed=False)
+    chunks: list[tuple[int, int, bytearray]] = []
+    for idx in range(256):
+        if not (present >> idx) & 1:
+            continue
+        address, length, _ = _CHUNK_ENTRY.unpack_from(data, 42 + idx * 8)
+        if length == 0:
+            chunk_data = make_uniform_chunk(address & 0xff, address >> 8)
+        elif address + length > len(data):
+            return None
+        else:
+            try:
+                chunk_data = decode_chunk_data(data[address:address + length])
+            except zlib.error:
+                return None
+        chunks.append((idx >> 4, idx & 15, chunk_data))
+    return chunks
+
+
+def read_section_chunks(x: int, y: int, path: Path) -> Iterator['WorldChunk']:
+    """
+    Reads every present chunk of a section file as virtual chunks, in `(x, y)` order. The file is only read, so this is
+    safe to use on the files of a world that is open elsewhere. If a chunk was being written while the file was read,
+    the file is read again.
+    """
+    for _ in range(SCAN_READ_ATTEMPTS):
+        chunks = _read_section_chunk_data(path)
+        if chunks is not None:
+            break
+    else:
+        raise SectionFormatError(f'Section kept changing while it was being read ({SCAN_READ_ATTEMPTS} attempts)')
+    for (cx, cy, chunk_data) in chunks:
+        yield WorldChunk.virtual_chunk(cx, cy, (x << 4) + cx, (y << 4) + cy, chunk_data)
+
+
+def scan_section(
+    x: int, y: int, path: Path,
+    mapper: Callable[['WorldChunk'], _T],
+    reducer: Callable[[_T, _T], _T],
+    initial: _T
+) -> tuple[_T, int]:
+    """
+    Maps every chunk of a section file and reduces the results, starting from `initial`. This is run in worker processes
+    by World.scan_chunks. Returns the result and the number of chunks scanned.
+    """
+    result = initial
+    chunk_count = 0
+    for chunk in read_section_chunks(x, y, path):
+        result = reducer(result, mapper(chunk))
+        chunk_count += 1
+    return result, chunk_count
+
+
 class SectionFormatError(Exception):
     pass
 
 
+class SectionInfo(TypedDict):
+    x: int
+    y: int
+    version: int
+    chunk_count: Optional[int]
+    size: int
+
+
 class WorldMeta(TypedDict):
     name: str
     seed: int
@@ -52,6 +307,8 @@ class WorldMeta(TypedDict):
 
 
 class AbstractWorld(abc.ABC):
+    __slots__ = ()
+
     def get_chunk(self, x: int, y: int) -> 'WorldChunk':
         chunk = self.get_chunk_or_none(x, y)
         if chunk is None:
@@ -91,6 +348,54 @@ class AbstractWorld(abc.ABC):
         chunk.set_tile_type(bx, by, type)
         return True
 
+    def get_neighbourhood(self, cx: int, cy: int) -> 'ChunkNeighbourhood':
+        return ChunkNeighbourhood(self, cx, cy)
+
+
+class ChunkNeighbourhood(AbstractWorld):
+    """
+    A view of the 3x3 chunks around the chunk at (cx, cy), for code that looks up a lot of blocks close to each other.
+    Each chunk in the neighbourhood is looked up in the world at most once, and lookups outside of the neighbourhood
+    are passed on to the world. A neighbourhood shouldn't be kept around after the chunks in it could have been
+    unloaded.
+    """
+    __slots__ = ('world', 'cx', 'cy', '_chunks', '_resolved')
+    world: AbstractWorld
+    cx: int
+    cy: int
+    _chunks: list[Optional['WorldChunk']]
+    _resolved: int
+
+    def __init__(self, world: AbstractWorld, cx: int, cy: int) -> None:
+        self.world = world
+        self.cx = cx
+        self.cy = cy
+        self._chunks = [None] * 9
+        self._resolved = 0
+
+    def get_chunk_or_none(self, x: int, y: int) -> Optional['WorldChunk']:
+        dx = x - self.cx + 1
+        dy = y - self.cy + 1
+        if not (0 <= dx < 3 and 0 <= dy < 3):
+            return self.world.get_chunk_or_none(x, y)
+        idx = dx * 3 + dy
+        if self._resolved & (1 << idx):
+            return self._chunks[idx]
+        chunk = self._chunks[idx] = self.world.get_chunk_or_none(x, y)
+        self._resolved |= 1 << idx
+        return chunk
+
+    def get_tile_type_or_none(self, x: int, y: int) -> Optional[Block]:
+        chunk = self.get_chunk_or_none(x >> 4, y >> 4)
+        if chunk is None:
+            return None
+        return chunk.get_tile_type(x & 15, y & 15)
+
+    def get_neighbourhood(self, cx: int, cy: int) -> 'ChunkNeighbourhood':
+        if abs(cx - self.cx) <= 1 and abs(cy - self.cy) <= 1:
+            return self
+        return self.world.get_neighbourhood(cx, cy)
+
 
 class World(AbstractWorld):
     name: str
@@ -98,27 +403,71 @@ class World(AbstractWorld):
     root: Path
 
     aloop: asyncio.AbstractEventLoop
+    flush_lock: asyncio.Lock
 
     meta_path: Path
     meta: WorldMeta
+    _saved_meta: Optional[WorldMeta]
     players_path: Path
+    player_db_path: Path
+    player_store: PlayerStore
+    sqlite_players: bool
     sections_path: Path
+    manifest_path: Path
+    manifest: dict[tuple[int, int], SectionInfo]
+    manifest_dirty: bool
+    _section_columns: Optional[dict[int, list[int]]]
     _players_by_name: dict[str, UUID]
     _players_by_uuid: dict[UUID, str]
+    player_cache: dict[UUID, 'OfflinePlayer']
+    max_cached_players: int
 
     open_sections: dict[tuple[int, int], 'WorldSection']
+    chunk_cache: dict[tuple[int, int], 'WorldChunk']
+    _generated_peeks: dict[tuple[int, int], 'WorldChunk']
     auto_optimize: bool
-
-    def __init__(self, name: str, auto_optimize: bool = False) -> None:
+    max_open_sections: int
+    max_mapped_bytes: int
+    section_extent_size: int
+    section_hits: int
+    section_misses: int
+    section_evictions: int
+
+    def __init__(self,
+        name: str,
+        auto_optimize: bool = False,
+        max_open_sections: int = MAX_OPEN_SECTIONS,
+        max_mapped_bytes: int = MAX_MAPPED_BYTES,
+        section_extent_size: int = SECTION_EXTENT_SIZE,
+        sqlite_players: bool = False,
+        max_cached_players: int = PLAYER_CACHE_SIZE,
+    ) -> None:
         self.name = name
         self.safe_name = safe_filename(name)
         self.root = Path('worlds') / self.safe_name
         self.players_path = self.root / 'players'
+        self.player_db_path = self.root / 'players.db'
+        self.sqlite_players = sqlite_players
         self.sections_path = self.root / 'sections'
+        self.manifest_path = self.root / 'sections.json'
+        self._saved_meta = None
+        self.manifest = {}
+        self.manifest_dirty = False
+        self._section_columns = None
         self._players_by_name = {}
         self._players_by_uuid = {}
+        self.player_cache = {}
+        self.max_cached_players = max_cached_players
         self.open_sections = {}
+        self.chunk_cache = {}
+        self._generated_peeks = {}
         self.auto_optimize = auto_optimize
+        self.max_open_sections = max_open_sections
+        self.max_mapped_bytes = max_mapped_bytes
+        self.section_extent_size = section_extent_size
+        self.section_hits = 0
+        self.section_misses = 0
+        self.section_evictions = 0
 
     def _default_meta(self) -> None:
         meta = DEFAULT_META.copy()
@@ -130,42 +479,308 @@ class World(AbstractWorld):
         if optimize is None:
             optimize = self.auto_optimize
         self.aloop = asyncio.get_running_loop()
+        self.flush_lock = asyncio.Lock()
         await self.ensure_exists()
         for (player_name, player_uuid_int) in self.meta['player_cache'].items():
             player_uuid = UUID(int=player_uuid_int)
             self._players_by_name[player_name] = player_uuid
             self._players_by_uuid[player_uuid] = player_name
+        await self.open_player_store()
+        await self.load_manifest()
         if optimize:
-            start = time.perf_counter()
-            with ThreadPoolExecutor(thread_name_prefix='Optimize') as executor:
-                tasks: list[Awaitable[bool]] = []
-                for sect_path in self.sections_path.glob('section_*_*.dat'):
-                    try:
-                        x, y = sect_path.name.split('_', 2)[1:]
-                        x = int(x)
-                        y = int(y.split('.', 1)[0])
-                    except Exception:
-                        logging.warn('Invalid section file name: %s', sect_path.name)
-                        continue
-                    sect = WorldSection(self, x, y, optimize=False)
-                    tasks.append(self.aloop.run_in_executor(executor, sect.optimize))
-                logging.info('Attempting to optimize %i sections', len(tasks))
-                results: list[Union[bool, BaseException]] = await asyncio.gather(*tasks, return_exceptions=True)
-                for sect in list(self.open_sections.values()):
-                    sect.close()
-            end = time.perf_counter()
-            success_count = results.count(True)
-            errors_count = sum(isinstance(r, Exception) for r in results)
-            if errors_count:
-                logging.info(
-                    'Optimized %i sections (with %i failures) in %f seconds',
-                    success_count, errors_count, end - start
-                )
+            await self.optimize_sections()
+
+    async def open_player_store(self) -> None:
+        """
+        Opens the SQLite player store if it's enabled or if the world already has one, migrating the players saved as
+        JSON files into it. Otherwise, players are stored as JSON files.
+        """
+        if self.sqlite_players or await self.aloop.run_in_executor(None, self.player_db_path.exists):
+            store = SqlitePlayerStore(self.player_db_path)
+            await store.ainit()
+            await store.migrate_json(self.players_path, self._players_by_uuid)
+            # The names are in the database now, so they don't need to be kept in the world meta anymore
+            self._players_by_name.clear()
+            self._players_by_uuid.clear()
+            self.player_store = store
+        else:
+            self.player_store = JsonPlayerStore(self)
+
+    def get_section_path(self, x: int, y: int) -> Path:
+        return self.sections_path / f'section_{x}_{y}.dat'
+
+    def iter_section_files(self) -> Iterator[tuple[int, int, Path]]:
+        """Lists the section files on disk. This is slow for large worlds, so prefer the manifest where possible."""
+        for sect_path in self.sections_path.glob('section_*_*.dat'):
+            try:
+                x, y = sect_path.name.split('_', 2)[1:]
+                x = int(x)
+                y = int(y.split('.', 1)[0])
+            except Exception:
+                logging.warn('Invalid section file name: %s', sect_path.name)
+                continue
+            yield x, y, sect_path
+
+    def _scan_section_files(self) -> dict[tuple[int, int], SectionInfo]:
+        manifest: dict[tuple[int, int], SectionInfo] = {}
+        for (x, y, sect_path) in self.iter_section_files():
+            try:
+                manifest[(x, y)] = read_section_info(x, y, sect_path)
+            except (OSError, SectionFormatError):
+                # Keep it in the manifest so that it still gets reported by the optimizer
+                manifest[(x, y)] = {'x': x, 'y': y, 'version': -1, 'chunk_count': None, 'size': 0}
+        return manifest
+
+    async def rebuild_manifest(self) -> None:
+        """Rebuilds the section manifest by reading the header of every section file."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self.manifest = await loop.run_in_executor(None, self._scan_section_files)
+        self.manifest_dirty = True
+        self._section_columns = None
+        for section in self.open_sections.values():
+            section.update_manifest()
+        end = time.perf_counter()
+        logging.info('Rebuilt section manifest (%i sections) in %f seconds', len(self.manifest), end - start)
+
+    async def load_manifest(self) -> None:
+        """
+        Loads the section manifest, which lists every section in the world along with its format version, chunk count,
+        and size. If the manifest is missing or unreadable, it is rebuilt from the section files instead.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            async with aiofiles.open(self.manifest_path, 'r') as fp:
+                data = await loop.run_in_executor(None, json.loads, await fp.read())
+            if data['version'] != SECTION_MANIFEST_VERSION:
+                raise ValueError(f'Unsupported manifest version {data["version"]}')
+            self.manifest = {(info['x'], info['y']): info for info in data['sections']}
+            self._section_columns = None
+        except FileNotFoundError:
+            logging.info('Section manifest not found. Building it.')
+            await self.rebuild_manifest()
+        except (JSONDecodeError, KeyError, TypeError, ValueError):
+            logging.warn('Invalid section manifest. Rebuilding it.', exc_info=True)
+            await self.rebuild_manifest()
+        else:
+            self.manifest_dirty = False
+
+    async def save_manifest(self) -> None:
+        if not self.manifest_dirty:
+            return
+        self.manifest_dirty = False
+        loop = asyncio.get_running_loop()
+        data = {
+            'version': SECTION_MANIFEST_VERSION,
+            'sections': sorted(self.manifest.values(), key=lambda info: (info['x'], info['y'])),
+        }
+        async with aiofiles.open(self.manifest_path, 'w') as fp:
+            await fp.write(await loop.run_in_executor(None, json.dumps, data))
+
+    def update_manifest(self, info: SectionInfo) -> None:
+        pos = (info['x'], info['y'])
+        if self.manifest.get(pos) != info:
+            if pos not in self.manifest:
+                self._section_columns = None
+            self.manifest[pos] = info
+            self.manifest_dirty = True
+
+    def get_section_column(self, x: int) -> list[int]:
+        """Returns the y coordinates of the sections in the world with the x coordinate `x`, from top to bottom."""
+        if self._section_columns is None:
+            columns: dict[int, list[int]] = {}
+            for (sx, sy) in self.manifest:
+                columns.setdefault(sx, []).append(sy)
+            for column in columns.values():
+                column.sort(reverse=True)
+            self._section_columns = columns
+        return self._section_columns.get(x, [])
+
+    def get_surface_height(self, x: int) -> Optional[int]:
+        """
+        Returns the y coordinate of the highest non-air block at x, using the section heightmaps (see WorldSection), or
+        None if there are no saved blocks at x. Chunks that haven't been generated yet aren't taken into account.
+        """
+        sx = x >> 8
+        for sy in self.get_section_column(sx):
+            height = self.get_section(sx, sy).get_column_height(x - (sx << 8))
+            if height >= 0:
+                return (sy << 8) + height
+        return None
+
+    async def optimize_sections(self, jobs: Optional[int] = None) -> tuple[int, int]:
+        """
+        Upgrades every outdated section in a process pool with `jobs` workers (defaults to the number of CPUs). Sections
+        that are already up to date are skipped based on the manifest alone. A section failing to upgrade doesn't
+        affect the others. Returns the number of sections optimized and the number of failures.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        to_optimize: list[tuple[int, int]] = []
+        up_to_date_count = 0
+        for (x, y), info in self.manifest.items():
+            if info['version'] == DATA_VERSION:
+                up_to_date_count += 1
+                continue
+            if (x, y) in self.open_sections:
+                self.open_sections[(x, y)].close()
+            to_optimize.append((x, y))
+        logging.info(
+            'Attempting to optimize %i sections (%i already up to date)', len(to_optimize), up_to_date_count
+        )
+        success_count = 0
+        errors_count = 0
+        done_count = 0
+        last_report = start
+
+        async def optimize(executor: ProcessPoolExecutor, x: int, y: int) -> None:
+            nonlocal success_count, errors_count, done_count, last_report
+            try:
+                optimized = await loop.run_in_executor(executor, optimize_section, self.name, x, y)
+            except Exception:
+                logging.error('Failed to optimize section (%i, %i)', x, y, exc_info=True)
+                errors_count += 1
             else:
+                success_count += optimized
+                info = await loop.run_in_executor(None, read_section_info, x, y, self.get_section_path(x, y))
+                self.update_manifest(info)
+            done_count += 1
+            now = time.perf_counter()
+            if now - last_report >= 1 or done_count == len(to_optimize):
+                last_report = now
                 logging.info(
-                    'Successfully optimized %i sections (with no failures) in %f seconds',
-                    success_count, end - start
+                    'Optimized %i/%i sections (%.1f%%)',
+                    done_count, len(to_optimize), done_count / len(to_optimize) * 100
+                )
+
+        if to_optimize:
+            with ProcessPoolExecutor(jobs) as executor:
+                await asyncio.gather(*(optimize(executor, x, y) for (x, y) in to_optimize))
+        end = time.perf_counter()
+        if errors_count:
+            logging.info(
+                'Optimized %i sections (with %i failures) in %f seconds',
+                success_count, errors_count, end - start
+            )
+        else:
+            logging.info(
+                'Successfully optimized %i sections (with no failures) in %f seconds',
+                success_count, end - start
+            )
+        return success_count, errors_count
+
+    async def compact_sections(self, jobs: Optional[int] = None) -> tuple[int, int, int]:
+        """
+        Rewrites every closed section with its chunks in spatial order and without any unused space, using a process
+        pool with `jobs` workers (defaults to the number of CPUs). Sections that are open, or that are opened while they
+        are being compacted, are left alone. Sections need to be up to date to be compacted. Returns the number of
+        sections compacted, the number of bytes reclaimed, and the number of failures.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        to_compact = [
+            (x, y) for ((x, y), info) in self.manifest.items()
+            if info['version'] == DATA_VERSION and (x, y) not in self.open_sections
+        ]
+        logging.info(
+            'Attempting to compact %i sections (%i skipped)', len(to_compact), len(self.manifest) - len(to_compact)
+        )
+        compacted_count = 0
+        reclaimed_bytes = 0
+        errors_count = 0
+
+        async def compact(executor: ProcessPoolExecutor, x: int, y: int) -> None:
+            nonlocal compacted_count, reclaimed_bytes, errors_count
+            path = self.get_section_path(x, y)
+            try:
+                result = await loop.run_in_executor(executor, compact_section_file, path)
+                if result is None:
+                    return
+                old_size, new_size, stat_key = result
+                compact_path = path.with_name(path.name + '.compact')
+                stat = path.stat()
+                if (x, y) in self.open_sections or (stat.st_mtime_ns, stat.st_size) != stat_key:
+                    logging.debug('Section (%i, %i) was modified while it was being compacted', x, y)
+                    compact_path.unlink()
+                    return
+                os.replace(compact_path, path)
+            except Exception:
+                logging.error('Failed to compact section (%i, %i)', x, y, exc_info=True)
+                errors_count += 1
+                return
+            compacted_count += 1
+            reclaimed_bytes += old_size - new_size
+            self.update_manifest(read_section_info(x, y, path))
+
+        if to_compact:
+            with ProcessPoolExecutor(jobs) as executor:
+                await asyncio.gather(*(compact(executor, x, y) for (x, y) in to_compact))
+        end = time.perf_counter()
+        logging.info(
+            'Compacted %i sections (with %i failures), reclaiming %i bytes in %f seconds',
+            compacted_count, errors_count, reclaimed_bytes, end - start
+        )
+        return compacted_count, reclaimed_bytes, errors_count
+
+    def iter_saved_chunks(self) -> Iterator['WorldChunk']:
+        """
+        Reads every saved chunk in the world as virtual chunks, in `(x, y)` order by section and then by chunk (see
+        read_section_chunks). Changes that haven't been flushed to disk aren't included.
+        """
+        for (x, y) in sorted(self.manifest):
+            if self.manifest[(x, y)]['version'] == DATA_VERSION:
+                yield from read_section_chunks(x, y, self.get_section_path(x, y))
+
+    async def scan_chunks(self,
+        mapper: Callable[['WorldChunk'], _T],
+        reducer: Callable[[_T, _T], _T],
+        initial: _T,
+        jobs: Optional[int] = None
+    ) -> tuple[_T, int, int]:
+        """
+        Maps every saved chunk in the world and reduces the results using a process pool with `jobs` workers (defaults to
+        the number of CPUs). `initial` needs to be the identity of `reducer`, as each section is reduced separately
+        starting from it, and the per-section results are then reduced in `(x, y)` order. `mapper`, `reducer`, and
+        `initial` need to be picklable. Open sections are flushed first, and the section files are only read, so this is
+        safe to use on a running world. Sections that aren't up to date are skipped. Returns the result, the number of
+        chunks scanned, and the number of failures.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        if self.open_sections:
+            await self.flush_sections()
+        to_scan = sorted(pos for (pos, info) in self.manifest.items() if info['version'] == DATA_VERSION)
+        logging.info(
+            'Attempting to scan %i sections (%i skipped)', len(to_scan), len(self.manifest) - len(to_scan)
+        )
+        chunk_count = 0
+        errors_count = 0
+
+        async def scan(executor: ProcessPoolExecutor, x: int, y: int) -> _T:
+            nonlocal chunk_count, errors_count
+            path = self.get_section_path(x, y)
+            try:
+                result, scanned = await loop.run_in_executor(
+                    executor, scan_section, x, y, path, mapper, reducer, initial
                 )
+            except Exception:
+                logging.error('Failed to scan section (%i, %i)', x, y, exc_info=True)
+                errors_count += 1
+                return initial
+            chunk_count += scanned
+            return result
+
+        result = initial
+        if to_scan:
+            with ProcessPoolExecutor(jobs) as executor:
+                for section_result in await asyncio.gather(*(scan(executor, x, y) for (x, y) in to_scan)):
+                    result = reducer(result, section_result)
+        end = time.perf_counter()
+        logging.info(
+            'Scanned %i chunks (with %i failures) in %f seconds (%.0f chunks/s)',
+            chunk_count, errors_count, end - start, chunk_count / max(end - start, 1e-9)
+        )
+        return result, chunk_count, errors_count
 
     async def ensure_exists(self) -> None:
         await self.mkdirs(self.root, self.players_path, self.sections_path)
@@ -180,7 +795,6 @@ class World(AbstractWorld):
             self._default_meta()
             await self.save_meta()
             meta = True
-        self.meta.setdefault('player_cache', {})
 
     async def mkdirs(self, *paths: Path) -> None:
         await asyncio.gather(
@@ -193,14 +807,40 @@ class World(AbstractWorld):
     async def load_meta(self) -> None:
         async with aiofiles.open(self.meta_path, 'r') as fp:
             self.meta = await self.aloop.run_in_executor(None, json.loads, await fp.read())
+        self.meta.setdefault('player_cache', {})
+        self._saved_meta = _copy_meta(self.meta)
 
-    async def save_meta(self) -> None:
+    def _update_player_cache_meta(self) -> None:
         self.meta['player_cache'].clear()
         for (player_name, player_uuid) in self._players_by_name.items():
             if player_uuid.int != 0:
                 self.meta['player_cache'][player_name] = player_uuid.int
+
+    def get_changed_meta_fields(self) -> list[str]:
+        """Returns the names of the meta fields that changed since the meta was last loaded or saved."""
+        self._update_player_cache_meta()
+        saved = self._saved_meta
+        if saved is None:
+            return list(self.meta)
+        return [key for (key, value) in self.meta.items() if saved.get(key) != value]
+
+    async def save_meta(self) -> None:
+        self._update_player_cache_meta()
+        # Serialize a snapshot, so the meta can keep changing while it's being written
+        meta = _copy_meta(self.meta)
         async with aiofiles.open(self.meta_path, 'w') as fp:
-            await fp.write(await self.aloop.run_in_executor(None, partial(json.dumps, self.meta, indent=2)))
+            await fp.write(await self.aloop.run_in_executor(None, partial(json.dumps, meta, indent=2)))
+        self._saved_meta = meta
+
+    async def save_meta_if_changed(self) -> list[str]:
+        """
+        Saves the meta if any of its fields changed since it was last loaded or saved, and returns the fields that did.
+        The meta is a single small file, so it's always rewritten as a whole.
+        """
+        changed = self.get_changed_meta_fields()
+        if changed:
+            await self.save_meta()
+        return changed
 
     def find_spawn(self, gen: 'WorldGenerator') -> tuple[int, int]:
         if self.meta['spawn_x'] is not None:
@@ -209,11 +849,26 @@ class World(AbstractWorld):
             else:
                 logging.warn('Invalid world spawn location (is partially null). Regenerating.')
         rand = random.Random(gen.seed)
-        x, y = self.get_closest_spawn(rand.randint(-128, 128), 0, gen)
+        x, y = self.search_spawn(rand.randint(-128, 128), gen)
         self.meta['spawn_x'] = x
         self.meta['spawn_y'] = y
         return x, y
 
+    def search_spawn(self, x: int, gen: 'WorldGenerator') -> tuple[int, int]:
+        """
+        Finds a spawn location at x right above the ground. The height of the ground comes from the saved heightmap if
+        there is one, or is otherwise estimated by the generator, so only the chunks around the estimate are
+        generated (see peek_generated_chunk). If the estimate isn't a valid spawn location, the closest one to it is
+        searched for instead.
+        """
+        surface = self.get_surface_height(x)
+        if surface is None:
+            surface = gen.get_ground_height(x)
+        y = surface + 1
+        if not self.is_valid_spawn(x, y, gen):
+            return self.get_closest_spawn(x, y, gen)
+        return x, y
+
     def get_closest_spawn(self, x: int, y: int, gen: 'WorldGenerator') -> tuple[int, int]:
         cmp = self._compare_valid_spawn(x, y, gen)
         dir = 1
@@ -247,16 +902,109 @@ class World(AbstractWorld):
         return 0
 
     def get_section(self, x: int, y: int) -> 'WorldSection':
-        if (x, y) in self.open_sections:
-            return self.open_sections[(x, y)]
+        section = self.open_sections.pop((x, y), None)
+        if section is not None:
+            # Reinsert to mark it as the most recently used
+            self.open_sections[(x, y)] = section
+            self.section_hits += 1
+            return section
+        self.section_misses += 1
         return WorldSection(self, x, y)
 
+    def get_mapped_bytes(self) -> int:
+        return sum(section.fp.size() for section in self.open_sections.values())
+
+    def evict_sections(self) -> int:
+        """
+        Closes the least recently used sections until there are at most `max_open_sections` open sections using at most
+        `max_mapped_bytes`, if possible. Sections with loaded or unsaved chunks are skipped. Callers may still hold
+        chunks of any open section, so this must only be called at a point where nothing does (such as right after a
+        periodic save), never while looking up chunks. Returns the number of sections closed.
+        """
+        over_count = len(self.open_sections) - self.max_open_sections
+        over_bytes = self.get_mapped_bytes() - self.max_mapped_bytes
+        if over_count <= 0 and over_bytes <= 0:
+            return 0
+        evicted = 0
+        for section in list(self.open_sections.values()):
+            if over_count <= 0 and over_bytes <= 0:
+                break
+            if section.is_pinned() or section.has_unsaved_chunks():
+                continue
+            over_count -= 1
+            over_bytes -= section.fp.size()
+            section.close()
+            evicted += 1
+        self.section_evictions += evicted
+        return evicted
+
+    def release_unused_chunks(self) -> int:
+        """
+        Releases the chunks of the open sections that aren't loaded, and the decoded data of the ones that have been
+        saved (see WorldSection.release_unused_chunks). Like evict_sections, this must only be called at a point where
+        nothing holds on to chunks. Returns the number of chunk buffers dropped.
+        """
+        return sum(section.release_unused_chunks() for section in self.open_sections.values())
+
     def get_chunk(self, x: int, y: int) -> 'WorldChunk':
+        # Most lookups are close to the previous one, so skip the section and chunk lookups for recently used chunks
+        chunk = self.chunk_cache.get((x, y))
+        if chunk is not None:
+            return chunk
+        sx = x >> 4
+        sy = y >> 4
+        cx = x - (sx << 4)
+        cy = y - (sy << 4)
+        chunk = self.get_section(sx, sy).get_chunk(cx, cy)
+        if len(self.chunk_cache) >= CHUNK_CACHE_SIZE:
+            del self.chunk_cache[next(iter(self.chunk_cache))]
+        self.chunk_cache[(x, y)] = chunk
+        return chunk
+
+    def peek_chunk(self, x: int, y: int) -> Optional['WorldChunk']:
+        """
+        Returns the chunk at (x, y) for reading, without loading it. Unlike get_chunk, this never pins the chunk's
+        section or creates a section file, and doesn't count as a use of the section. If the chunk isn't loaded, a
+        read-only virtual chunk that shares the section's copy of the data is returned. Returns None if the chunk
+        doesn't exist.
+        """
+        chunk = self.chunk_cache.get((x, y))
+        if chunk is not None:
+            return chunk
         sx = x >> 4
         sy = y >> 4
+        section = self.open_sections.get((sx, sy))
+        if section is None:
+            if (sx, sy) not in self.manifest:
+                return None
+            section = WorldSection(self, sx, sy)
         cx = x - (sx << 4)
         cy = y - (sy << 4)
-        return self.get_section(sx, sy).get_chunk(cx, cy)
+        chunk = section.cached_chunks.get((cx, cy))
+        if chunk is not None:
+            return chunk
+        data = section.peek_chunk_data(cx, cy)
+        if data is None:
+            return None
+        return WorldChunk.virtual_chunk(cx, cy, x, y, data, read_only=True)
+
+    def get_chunk_or_none(self, x: int, y: int) -> Optional['WorldChunk']:
+        return self.peek_chunk(x, y)
+
+    def set_tile_type_if_loaded(self, x: int, y: int, type: Block) -> bool:
+        """
+        Sets a block if its chunk exists, and returns whether it did. Unlike get_chunk_or_none, this loads the chunk
+        (see get_chunk) so that the change is saved.
+        """
+        cx, cy, bx, by = self._get_chunk_for_block(x, y)
+        if self.peek_chunk(cx, cy) is None:
+            return False
+        self.get_chunk(cx, cy).set_tile_type(bx, by, type)
+        return True
+
+    def uncache_section_chunks(self, section: 'WorldSection') -> None:
+        for pos in [pos for (pos, chunk) in self.chunk_cache.items() if chunk.section is section]:
+            del self.chunk_cache[pos]
 
     def get_generated_chunk(self, x: int, y: int, gen: 'WorldGenerator') -> 'WorldChunk':
         c = self.get_chunk(x, y)
@@ -265,27 +1013,195 @@ class World(AbstractWorld):
             c.version = CHUNK_VERSION
         return c
 
+    def get_generated_chunks(
+        self, positions: Iterable[tuple[int, int]], gen: 'WorldGenerator'
+    ) -> dict[tuple[int, int], 'WorldChunk']:
+        """
+        Like get_generated_chunk for several chunks at once. The chunks that haven't been generated yet are generated
+        together (see WorldGenerator.generate_chunks).
+        """
+        chunks = {(x, y): self.get_chunk(x, y) for (x, y) in positions}
+        ungenerated = [chunk for chunk in chunks.values() if not chunk.has_generated]
+        if ungenerated:
+            gen.generate_chunks(ungenerated)
+            for chunk in ungenerated:
+                chunk.version = CHUNK_VERSION
+        return chunks
+
+    async def get_generated_chunk_async(self, x: int, y: int, pool: 'ChunkGenerationPool') -> 'WorldChunk':
+        """Like get_generated_chunk, but the chunk is generated by a worker process of `pool` if it needs to be."""
+        chunk = self.get_chunk(x, y)
+        if chunk.has_generated:
+            return chunk
+        # Other requests may be waiting for the same chunk, so they mustn't be cancelled along with this one
+        data = await asyncio.shield(pool.generate(x, y))
+        # The section may have been closed while the chunk was being generated, and the chunk may have been generated
+        # by something else in the meantime
+        chunk = self.get_chunk(x, y)
+        if not chunk.has_generated:
+            chunk.set_data(data)
+        return chunk
+
+    def peek_generated_chunk(self, x: int, y: int, gen: 'WorldGenerator') -> 'WorldChunk':
+        """
+        Like get_generated_chunk, but the chunk is only read (see peek_chunk). If the chunk hasn't been generated yet,
+        it is generated into a read-only virtual chunk that isn't saved.
+        """
+        chunk = self.peek_chunk(x, y)
+        if chunk is not None and chunk.has_generated:
+            return chunk
+        chunk = self._generated_peeks.get((x, y))
+        if chunk is None:
+            generated = WorldChunk.virtual_chunk(x & 15, y & 15, x, y, bytearray(1024))
+            gen.generate_chunk(generated)
+            generated.version = CHUNK_VERSION
+            chunk = WorldChunk.virtual_chunk(x & 15, y & 15, x, y, generated.fp, read_only=True)
+            if len(self._generated_peeks) >= CHUNK_CACHE_SIZE:
+                del self._generated_peeks[next(iter(self._generated_peeks))]
+            self._generated_peeks[(x, y)] = chunk
+        return chunk
+
     def get_generated_tile_type(self, x: int, y: int, gen: 'WorldGenerator') -> Block:
         cx = x >> 4
         cy = y >> 4
         bx = x - (cx << 4)
         by = y - (cy << 4)
-        return self.get_generated_chunk(cx, cy, gen).get_tile_type(bx, by)
+        return self.peek_generated_chunk(cx, cy, gen).get_tile_type(bx, by)
+
+    def read_region(self, x: int, y: int, width: int, height: int) -> ChunkArray:
+        """
+        Returns the block IDs of the `width` by `height` area with its lower left corner at (x, y), indexed as `[x, y]`
+        relative to that corner. The chunks are only peeked (see peek_chunk), and blocks in chunks that don't exist are
+        read as air.
+        """
+        region = np.zeros((width, height), np.uint8)
+        for cx in range(x >> 4, ((x + width - 1) >> 4) + 1):
+            for cy in range(y >> 4, ((y + height - 1) >> 4) + 1):
+                chunk = self.peek_chunk(cx, cy)
+                if chunk is None:
+                    continue
+                x1 = max(x, cx << 4)
+                y1 = max(y, cy << 4)
+                x2 = min(x + width, (cx + 1) << 4)
+                y2 = min(y + height, (cy + 1) << 4)
+                region[x1 - x:x2 - x, y1 - y:y2 - y] = (
+                    chunk.get_tile_view()[x1 - (cx << 4):x2 - (cx << 4), y1 - (cy << 4):y2 - (cy << 4)]
+                )
+        return region
+
+    def write_region(self,
+        x: int, y: int,
+        ids: npt.ArrayLike,
+        gen: 'WorldGenerator'
+    ) -> list[tuple['WorldChunk', npt.NDArray[np.bool_]]]:
+        """
+        Sets the block IDs of an area at once, with its lower left corner at (x, y) and `ids` indexed as `[x, y]`
+        relative to that corner. Chunks are generated first if they need to be. Instead of updating the lighting after
+        every block, each chunk that changed is relit once (see WorldChunk.relight_blocks). Returns the changed chunks
+        along with a 16x16 mask of the blocks whose type or lighting changed in each of them.
+        """
+        ids = np.asarray(ids, np.uint8)
+        width, height = ids.shape
+        changed: list[tuple[WorldChunk, npt.NDArray[np.bool_]]] = []
+        chunks = self.get_generated_chunks(
+            itertools.product(range(x >> 4, ((x + width - 1) >> 4) + 1), range(y >> 4, ((y + height - 1) >> 4) + 1)),
+            gen
+        )
+        for cx in range(x >> 4, ((x + width - 1) >> 4) + 1):
+            for cy in range(y >> 4, ((y + height - 1) >> 4) + 1):
+                x1 = max(x, cx << 4)
+                y1 = max(y, cy << 4)
+                x2 = min(x + width, (cx + 1) << 4)
+                y2 = min(y + height, (cy + 1) << 4)
+                new_tiles = ids[x1 - x:x2 - x, y1 - y:y2 - y]
+                chunk = chunks[(cx, cy)]
+                tiles = chunk.get_tile_view()
+                area = tiles[x1 - (cx << 4):x2 - (cx << 4), y1 - (cy << 4):y2 - (cy << 4)]
+                if np.array_equal(area, new_tiles):
+                    continue
+                old_tiles = chunk.get_tile_ids()
+                old_lighting = chunk.get_packed_lighting_array()
+                area[:, :] = new_tiles
+                chunk.relight_blocks()
+                changed.append((chunk, (tiles != old_tiles) | (chunk.get_lighting_view() != old_lighting)))
+        return changed
+
+    async def flush_sections(self, max_bytes: Optional[int] = None) -> tuple[int, int]:
+        """
+        Writes dirty chunks in open sections to disk without blocking the event loop. If `max_bytes` is specified,
+        writing stops once about that many bytes of chunk records have been written, and the rest are left for the next
+        call. Returns the number of chunks and the number of bytes of records written.
+        """
+        chunk_count = 0
+        bytes_written = 0
+        record_size = 1024 # Estimated from the records written so far, to decide how many chunks fit in the budget
+        async with self.flush_lock:
+            for section in list(self.open_sections.values()):
+                section_count = 0
+                # Chunks modified while writing are left for the next call, so stop after one pass over the section
+                while section_count < 256 and (max_bytes is None or bytes_written < max_bytes):
+                    limit = 256 - section_count
+                    if max_bytes is not None:
+                        limit = min(limit, max((max_bytes - bytes_written) // record_size, 1))
+                    taken = section.take_dirty_chunks(limit)
+                    if not taken:
+                        break
+                    section_count += taken
+                    chunk_count += taken
+                    bytes_written += await self.aloop.run_in_executor(None, section.write_pending_chunks)
+                    record_size = max(bytes_written // chunk_count, 1)
+                if section_count:
+                    section.update_manifest()
+                if max_bytes is not None and bytes_written >= max_bytes:
+                    break
+        return chunk_count, bytes_written
 
     async def close(self) -> None:
-        await self.save_meta()
+        await self.save_meta_if_changed()
+        await self.player_store.close()
         for s in self.open_sections.values():
             s._close()
         self.open_sections.clear()
-
-    def get_player_by_name(self, name: str) -> 'OfflinePlayer':
-        return OfflinePlayer(name, self._players_by_name[name], self)
-
-    def get_player_by_uuid(self, uuid: UUID) -> 'OfflinePlayer':
-        try:
-            return OfflinePlayer(self._players_by_uuid[uuid], uuid, self)
-        except KeyError:
-            return OfflinePlayer(None, uuid, self)
+        self.chunk_cache.clear()
+        await self.save_manifest()
+
+    async def get_player_by_name(self, name: str) -> 'OfflinePlayer':
+        """Returns the loaded record of the player called `name`. Raises KeyError if no player has that name."""
+        uuid = await self.player_store.get_uuid(name)
+        if uuid is None:
+            raise KeyError(name)
+        return await self.get_player_by_uuid(uuid)
+
+    async def get_player_by_uuid(self, uuid: UUID) -> 'OfflinePlayer':
+        """
+        Returns the loaded record of a player from the player cache, loading it from the player store if it isn't
+        cached. The same object is returned until it's evicted, so changes to it are seen by later lookups. If the player
+        store has no record of the player, a new record is returned, which is only cached once it's saved.
+        """
+        player = self.get_cached_player(uuid)
+        if player is None:
+            player = OfflinePlayer(await self.player_store.get_name(uuid), uuid, self)
+            await player.ainit() # Caches it if it's stored
+        return player
+
+    def get_cached_player(self, uuid: UUID) -> Optional['OfflinePlayer']:
+        player = self.player_cache.pop(uuid, None)
+        if player is not None:
+            # Reinsert to mark it as the most recently used
+            self.player_cache[uuid] = player
+        return player
+
+    def cache_player(self, player: 'OfflinePlayer') -> None:
+        """Makes `player` the cached record for its UUID, replacing any other record, and evicts old records."""
+        self.player_cache.pop(player.uuid, None)
+        self.player_cache[player.uuid] = player
+        while len(self.player_cache) > self.max_cached_players:
+            del self.player_cache[next(iter(self.player_cache))]
+
+    def release_player(self, player: 'OfflinePlayer') -> None:
+        """Replaces `player` in the player cache with a plain record, so that the cache doesn't keep it alive."""
+        if self.player_cache.get(player.uuid) is player:
+            self.player_cache[player.uuid] = player.copy_record()
 
     def __str__(self) -> str:
         return self.name
@@ -297,15 +1213,45 @@ class World(AbstractWorld):
 class WorldSection:
     """
     Section format:
-        0:6     -- The file magic, b'BEYOND'
-        6:10    -- The section format version, stored as a UINT4
-        10:42   -- A large bitmask representing which chunks are present in this section. If a chunk isn't present, it
-                   also needs to have an index of 0 in the relative offset table.
-        42:298  -- Chunk relative offset indices
-        298:end -- Chunk data (see chunk data format)
-    Chunk data format:
-        Each chunk is stored at the address `298 + file[42 + x * 16 + y] * 1024`. Each chunk is stored in chunk format
-        (see the WorldChunk docstring).
+        0:6       -- The file magic, b'BEYOND'
+        6:10      -- The section format version, stored as a UINT4
+        10:42     -- A large bitmask representing which chunks are present in this section. If a chunk isn't present, it
+                     also needs to have an all-zero entry in the chunk offset table.
+        42:2090   -- Chunk offset table (see chunk offset table format)
+        2090:2094 -- The high-water mark (UINT4). This is the address where the next record will be placed. Everything
+                     from here to the end of the file is preallocated space.
+        2094:2606 -- Heightmap (see heightmap format)
+        2606:end  -- Chunk records (see chunk record format)
+    Chunk offset table format:
+        Each chunk has an 8-byte entry at the address `42 + (x * 16 + y) * 8`. An entry is made up of the absolute
+        address of the chunk's record (UINT4), the length of the record (UINT2), and the number of bytes reserved for
+        the record (UINT2). A record is rewritten in place if it still fits in its reserved space, otherwise it is moved
+        to the high-water mark. When the preallocated space runs out, the file is grown by a whole extent at a time
+        (see World.section_extent_size). The preallocated space is trimmed when the section is closed.
+        If the length of an entry is 0, the chunk is uniform (see get_uniform_chunk) and has no record. Instead, the
+        address field holds `version << 8 | block_type`. A uniform chunk is given a record when something other than a
+        single block type is written to it. Space left behind by a chunk that becomes uniform is reclaimed by the
+        compactor.
+    Chunk record format:
+        Each record is a zlib stream (see encode_chunk_data) that decodes to the chunk format (see the WorldChunk
+        docstring). Records are decoded into an in-memory buffer the first time the chunk is accessed, which is dropped
+        again once the chunk is unloaded and saved (see release_unused_chunks). Chunks that have been modified since
+        they were last written are tracked in a dirty bitmask, and only those are encoded back into the file when the
+        section is flushed or closed.
+    Heightmap format:
+        Each column of blocks in the section has a signed INT2 at the address `2094 + x * 2`, where `x` is relative to
+        the section. It holds the height of the highest non-air block in the column relative to the bottom of the
+        section, or -1 if the column is empty. Chunk columns that have been modified are tracked in a stale bitmask,
+        and are recalculated when the heightmap is read or the section is flushed.
+    Version 5 format:
+        Same as above, except that there is no heightmap, and records start at 2094.
+    Version 4 format:
+        Same as above, except that there are no uniform chunks.
+    Version 3 format:
+        Same as above, except that there is no high-water mark, and records start at 2090.
+    Version 2 format:
+        Same as above, except that there is no high-water mark, and 42:298 holds one-byte chunk relative offset indices instead of the offset table.
+        Each chunk is stored uncompressed at the address `298 + file[42 + x * 16 + y] * 1024`.
     """
     world: World
     x: int
@@ -314,28 +1260,49 @@ class WorldSection:
     path: Path
     fp: mmap
     cached_chunks: dict[tuple[int, int], 'WorldChunk']
+    chunk_data: dict[tuple[int, int], bytearray]
+    dirty_chunks: int
+    lock: threading.RLock
+    write_lock: threading.RLock
     load_counter: int
+    _pending_chunks: dict[tuple[int, int], bytes]
+    _stale_columns: int
     _data_version: int
 
     def __init__(self, world: World, x: int, y: int, optimize: Optional[bool] = None) -> None:
         self.world = world
         self.x = x
         self.y = y
-        self.path = world.sections_path / f'section_{x}_{y}.dat'
+        self.cached_chunks = {}
+        self.chunk_data = {}
+        self.dirty_chunks = 0
+        self.lock = threading.RLock()
+        self.write_lock = threading.RLock()
+        self.load_counter = 0
+        self._pending_chunks = {}
+        self._stale_columns = 0
+        self.path = world.get_section_path(x, y)
         with open(self.path, 'a+b') as fp:
             if fp.tell() == 0:
                 fp.write(b'BEYOND')
                 fp.write(DATA_VERSION.to_bytes(4, 'little', signed=False))
+                fp.write(bytes(2080))
+                fp.write(SECTION_HEADER_SIZE.to_bytes(4, 'little', signed=False))
+                fp.write(_EMPTY_HEIGHTMAP)
+                fp.flush()
             if fp.tell() < 298:
                 fp.write(bytes(298 - fp.tell()))
                 fp.flush()
             self.fp = mmap(fp.fileno(), fp.tell(), access=ACCESS_WRITE)
-        self._load_magic()
+        try:
+            self._load_magic()
+        except BaseException:
+            self.fp.close()
+            raise
         world.open_sections[(x, y)] = self
-        self.cached_chunks = {}
-        self.load_counter = 0
         if (optimize is None and world.auto_optimize) or optimize:
             self.optimize()
+        self.update_manifest()
 
     def _load_magic(self) -> None:
         magic = self.fp[:6]
@@ -353,8 +1320,15 @@ class WorldSection:
         if self.data_version == DATA_VERSION:
             return False
         start = time.perf_counter()
-        if self.data_version < DATA_VERSION:
+        if self.data_version < 2:
             self._convert_1_2()
+        if self.data_version < 3:
+            self._convert_2_3()
+        if self.data_version < 4:
+            self._convert_3_4()
+        if self.data_version < 5:
+            self._convert_4_5()
+        self._convert_5_6()
         self.data_version = DATA_VERSION
         end = time.perf_counter()
         logging.info('Optimized section (%i, %i) in %f seconds', self.x, self.y, end - start)
@@ -395,13 +1369,107 @@ class WorldSection:
             self._mark_chunk_present(0, 0)
             fp[42] = new_idx
 
+    def _convert_2_3(self) -> None:
+        fp = self.fp
+        records: list[tuple[int, int, bytes]] = []
+        for x in range(16):
+            for y in range(16):
+                if not self.is_chunk_present(x, y):
+                    continue
+                old_addr = 298 + (fp[42 + x * 16 + y] << 10)
+                records.append((x, y, encode_chunk_data(fp[old_addr:old_addr + 1024].ljust(1024, b'\0'))))
+        dest_size = 2090 + sum(_get_reserved_size(len(record)) for (_, _, record) in records)
+        fp.flush()
+        fp.resize(dest_size)
+        fp[42:2090] = bytes(2048)
+        new_addr = 2090
+        for (x, y, record) in records:
+            reserved = _get_reserved_size(len(record))
+            fp[new_addr:new_addr + len(record)] = record
+            self._set_chunk_entry(x, y, new_addr, len(record), reserved)
+            new_addr += reserved
+        fp.flush()
+        self.data_version = 3
+
+    def _convert_3_4(self) -> None:
+        fp = self.fp
+        old_size = fp.size()
+        fp.flush()
+        fp.resize(old_size + 4)
+        fp.move(2094, 2090, old_size - 2090)
+        for x in range(16):
+            for y in range(16):
+                if self.is_chunk_present(x, y):
+                    address, length, reserved = self._get_chunk_entry(x, y)
+                    self._set_chunk_entry(x, y, address + 4, length, reserved)
+        self.high_water_mark = old_size + 4
+        fp.flush()
+        self.data_version = 4
+
+    def _convert_4_5(self) -> None:
+        # Records for uniform chunks are dropped, and the space is left for the compactor
+        for x in range(16):
+            for y in range(16):
+                if not self.is_chunk_present(x, y):
+                    continue
+                address, length, _ = self._get_chunk_entry(x, y)
+                uniform = get_uniform_chunk(decode_chunk_data(self.fp[address:address + length]))
+                if uniform is not None and uniform[1] < 1 << 24:
+                    self._set_chunk_entry(x, y, uniform[1] << 8 | uniform[0], 0, 0)
+        self.fp.flush()
+        self.data_version = 5
+
+    def _convert_5_6(self) -> None:
+        fp = self.fp
+        old_size = fp.size()
+        fp.flush()
+        fp.resize(old_size + 512)
+        fp.move(2606, 2094, old_size - 2094)
+        fp[2094:2606] = _EMPTY_HEIGHTMAP
+        for x in range(16):
+            for y in range(16):
+                if self.is_chunk_present(x, y):
+                    address, length, reserved = self._get_chunk_entry(x, y)
+                    if length != 0: # Uniform chunks have no record to move
+                        self._set_chunk_entry(x, y, address + 512, length, reserved)
+        self.high_water_mark += 512
+        fp.flush()
+        # The heightmap is calculated once the section is up to date
+        self._stale_columns = 0xffff
+
     def close(self) -> None:
         logging.debug('Closing section (%i, %i)', self.x, self.y)
         self._close()
         self.world.open_sections.pop((self.x, self.y), None)
 
     def _close(self) -> None:
-        self.fp.close()
+        self.world.uncache_section_chunks(self)
+        with self.write_lock, self.lock:
+            if self.fp.closed:
+                return
+            self.flush()
+            self.trim()
+            self.update_manifest()
+            self.fp.close()
+
+    def get_info(self) -> SectionInfo:
+        return {
+            'x': self.x,
+            'y': self.y,
+            'version': self.data_version,
+            'chunk_count': _count_present_chunks(self.data_version, self.fp[10:42]),
+            'size': self.fp.size(),
+        }
+
+    def update_manifest(self) -> None:
+        if not self.fp.closed: # Closing updates the manifest too
+            self.world.update_manifest(self.get_info())
+
+    def is_pinned(self) -> bool:
+        return any(chunk.load_counter > 0 for chunk in self.cached_chunks.values())
+
+    def has_unsaved_chunks(self) -> bool:
+        return self.dirty_chunks != 0 or bool(self._pending_chunks)
 
     def __enter__(self) -> 'WorldSection':
         self.mark_loaded()
@@ -411,7 +1479,8 @@ class WorldSection:
         self.mark_unloaded(self.__class__.close)
 
     def __del__(self) -> None:
-        self._close()
+        if hasattr(self, 'fp'):
+            self._close()
 
     def is_chunk_present(self, x: int, y: int) -> bool:
         idx = x * 16 + y
@@ -421,19 +1490,211 @@ class WorldSection:
         idx = x * 16 + y
         self.fp[(idx >> 3) + 10] |= 1 << (idx & 7)
 
-    def _get_chunk_base_address(self, x: int, y: int) -> int:
-        return 42 + x * 16 + y
+    def _get_chunk_entry(self, x: int, y: int) -> tuple[int, int, int]:
+        return _CHUNK_ENTRY.unpack_from(self.fp, 42 + (x * 16 + y) * 8)
 
-    def _get_chunk_address(self, x: int, y: int) -> int:
-        return 298 + (self.fp[self._get_chunk_base_address(x, y)] << 10)
+    def _set_chunk_entry(self, x: int, y: int, address: int, length: int, reserved: int) -> None:
+        _CHUNK_ENTRY.pack_into(self.fp, 42 + (x * 16 + y) * 8, address, length, reserved)
 
     def get_chunk(self, x: int, y: int) -> 'WorldChunk':
         if (x, y) not in self.cached_chunks:
             self.cached_chunks[(x, y)] = WorldChunk(self, x, y)
         return self.cached_chunks[(x, y)]
 
-    def flush(self) -> None:
-        self.fp.flush()
+    def peek_chunk_data(self, x: int, y: int) -> Optional[bytearray]:
+        """Returns the data of the chunk if it exists, without creating a WorldChunk for it."""
+        if (x, y) in self.chunk_data or self.is_chunk_present(x, y):
+            return self.get_chunk_data(x, y)
+        return None
+
+    def uncache_chunk(self, x: int, y: int) -> None:
+        self.cached_chunks.pop((x, y), None)
+        self.world.chunk_cache.pop((x + (self.x << 4), y + (self.y << 4)), None)
+
+    def release_unused_chunks(self) -> int:
+        """
+        Forgets the WorldChunks that aren't loaded, and drops the decoded data of every chunk without a WorldChunk that
+        has no unsaved changes, so that it's decoded from the file again the next time it's used. Otherwise, the data of
+        every chunk that was ever used would be kept for as long as the section is open. Returns the number of chunk
+        buffers dropped.
+        """
+        for (pos, chunk) in list(self.cached_chunks.items()):
+            if chunk.load_counter <= 0:
+                self.uncache_chunk(*pos)
+                self.mark_unloaded() # Balances the one in WorldChunk.__init__
+        with self.lock:
+            released = [
+                pos for pos in self.chunk_data
+                if pos not in self.cached_chunks
+                if not self.dirty_chunks & (1 << (pos[0] * 16 + pos[1]))
+                if pos not in self._pending_chunks
+            ]
+            for pos in released:
+                del self.chunk_data[pos]
+        return len(released)
+
+    def get_chunk_data(self, x: int, y: int) -> bytearray:
+        data = self.chunk_data.get((x, y))
+        if data is None:
+            with self.lock:
+                if self.data_version != DATA_VERSION:
+                    self.optimize()
+                    self.update_manifest()
+                if self.is_chunk_present(x, y):
+                    address, length, _ = self._get_chunk_entry(x, y)
+                    if length == 0:
+                        data = make_uniform_chunk(address & 0xff, address >> 8)
+                    else:
+                        data = decode_chunk_data(self.fp[address:address + length])
+                else:
+                    data = bytearray(1024)
+            self.chunk_data[(x, y)] = data
+        return data
+
+    def mark_chunk_dirty(self, x: int, y: int) -> None:
+        self.dirty_chunks |= 1 << (x * 16 + y)
+        self._stale_columns |= 1 << x
+
+    def get_column_height(self, x: int) -> int:
+        """
+        Returns the height of the highest non-air block in a column of blocks, relative to the bottom of the section, or
+        -1 if there are only air blocks. `x` is relative to the section.
+        """
+        with self.lock:
+            if self.data_version != DATA_VERSION:
+                self.optimize()
+                self.update_manifest()
+            if self._stale_columns & (1 << (x >> 4)):
+                self._update_heightmap(x >> 4)
+            return int.from_bytes(self.fp[2094 + x * 2:2096 + x * 2], 'little', signed=True)
+
+    def update_heightmap(self) -> None:
+        """Recalculates the heights of the stale chunk columns. This must be called from the event loop."""
+        with self.lock:
+            stale = self._stale_columns
+            while stale:
+                x = (stale & -stale).bit_length() - 1
+                stale &= stale - 1
+                self._update_heightmap(x)
+
+    def _update_heightmap(self, x: int) -> None:
+        heights = np.full(16, -1, np.int16)
+        unresolved = np.ones(16, np.bool_)
+        for y in range(15, -1, -1):
+            data = self.peek_chunk_data(x, y)
+            if data is None:
+                continue
+            non_air = np.frombuffer(data, np.uint8, 512).reshape(16, 16, 2)[:, :, 0] != 0
+            found = unresolved & non_air.any(axis=1)
+            if not found.any():
+                continue
+            heights[found] = (y << 4) + 15 - np.argmax(non_air[found, ::-1], axis=1)
+            unresolved &= ~found
+            if not unresolved.any():
+                break
+        self.fp[2094 + x * 32:2126 + x * 32] = heights.astype('<i2').tobytes()
+        self._stale_columns &= ~(1 << x)
+
+    def take_dirty_chunks(self, limit: int = 256) -> int:
+        """
+        Copies up to `limit` dirty chunks so that they can be written by write_pending_chunks, and marks them as clean.
+        This must be called from the thread that modifies the chunks (i.e. the event loop).
+        """
+        with self.lock:
+            self.update_heightmap()
+            dirty = self.dirty_chunks
+            taken = 0
+            while dirty and taken < limit:
+                idx = (dirty & -dirty).bit_length() - 1
+                dirty &= dirty - 1
+                pos = (idx >> 4, idx & 15)
+                self._pending_chunks[pos] = bytes(self.chunk_data[pos])
+                taken += 1
+            self.dirty_chunks = dirty
+        return taken
+
+    def write_pending_chunks(self) -> int:
+        """
+        Encodes and writes the chunks copied by take_dirty_chunks to disk. This is safe to call from another thread.
+        The records are encoded and copied into the section while holding `lock`, but the section is only synced to disk
+        after releasing it, so readers on the event loop don't wait for disk I/O. Returns the number of bytes of records
+        written.
+        """
+        # `write_lock` is always acquired before `lock`, and keeps the section from being resized or closed while it's
+        # being synced
+        with self.write_lock:
+            with self.lock:
+                pending, self._pending_chunks = self._pending_chunks, {}
+                if not pending or self.fp.closed:
+                    return 0
+                record_bytes, written_ranges = self._write_chunks(pending)
+            fp = self.fp
+            for (start, end) in written_ranges:
+                start -= start % ALLOCATIONGRANULARITY
+                fp.flush(start, end - start)
+            return record_bytes
+
+    def _write_chunks(self, chunks: dict[tuple[int, int], bytes]) -> tuple[int, list[tuple[int, int]]]:
+        """Writes chunk records into the section. Returns the number of bytes of records, and the ranges to sync."""
+        fp = self.fp
+        record_bytes = 0
+        written_ranges: list[tuple[int, int]] = [(0, SECTION_HEADER_SIZE)]
+        appended: list[tuple[int, int, bytes]] = []
+        for ((x, y), data) in chunks.items():
+            present = self.is_chunk_present(x, y)
+            if not present and data == EMPTY_CHUNK:
+                continue # Don't store chunks that nothing has been written to
+            uniform = get_uniform_chunk(data)
+            if uniform is not None and uniform[1] < 1 << 24:
+                self._set_chunk_entry(x, y, uniform[1] << 8 | uniform[0], 0, 0)
+                self._mark_chunk_present(x, y)
+                continue
+            record = encode_chunk_data(data)
+            record_bytes += len(record)
+            if present:
+                address, length, reserved = self._get_chunk_entry(x, y)
+                if len(record) <= reserved:
+                    fp[address:address + len(record)] = record
+                    self._set_chunk_entry(x, y, address, len(record), reserved)
+                    written_ranges.append((address, address + len(record)))
+                    continue
+            appended.append((x, y, record))
+        if appended:
+            new_addr = self.high_water_mark
+            self.high_water_mark = self._allocate(sum(_get_reserved_size(len(record)) for (_, _, record) in appended))
+            written_ranges.append((new_addr, self.high_water_mark))
+            for (x, y, record) in appended:
+                reserved = _get_reserved_size(len(record))
+                fp[new_addr:new_addr + len(record)] = record
+                self._set_chunk_entry(x, y, new_addr, len(record), reserved)
+                self._mark_chunk_present(x, y)
+                new_addr += reserved
+        return record_bytes, written_ranges
+
+    def _allocate(self, size: int) -> int:
+        """Makes room for `size` more bytes past the high-water mark, and returns the new high-water mark."""
+        new_mark = self.high_water_mark + size
+        if new_mark > self.fp.size():
+            extent = self.world.section_extent_size
+            new_size = (new_mark + extent - 1) // extent * extent if extent > 0 else new_mark
+            self.fp.flush()
+            self.fp.resize(new_size)
+        return new_mark
+
+    def trim(self) -> int:
+        """Removes the preallocated space at the end of the file, and returns the number of bytes removed."""
+        with self.write_lock, self.lock:
+            slack = self.fp.size() - self.high_water_mark
+            if slack <= 0 or self.data_version != DATA_VERSION:
+                return 0
+            self.fp.flush()
+            self.fp.resize(self.high_water_mark)
+            return slack
+
+    def flush(self) -> int:
+        with self.write_lock, self.lock:
+            self.take_dirty_chunks()
+            return self.write_pending_chunks()
 
     def mark_loaded(self) -> int:
         self.load_counter += 1
@@ -445,6 +1706,14 @@ class WorldSection:
             cb(self)
         return self.load_counter
 
+    @property
+    def high_water_mark(self) -> int:
+        return int.from_bytes(self.fp[2090:2094], 'little', signed=False)
+
+    @high_water_mark.setter
+    def high_water_mark(self, address: int) -> None:
+        self.fp[2090:2094] = address.to_bytes(4, 'little', signed=False)
+
     @property
     def data_version(self) -> int:
         return self._data_version
@@ -469,8 +1738,9 @@ class WorldChunk:
         Each block is stored at an address (relative to the start of the chunk) of `(x * 16 + y) * 2`. Each block is
         two bytes: a UINT8 representing the type, and a single representing any metadata (could be any format)
     Biome data format:
-        Each biome is stored at an address (relative to the start of the chunk) of `516 + (x * 16 + y) * 2`. Each biome
-        is two bytes: a UINT8 representing the type, and a single representing any metadata (could be any format)
+        Biomes are stored per column. Each biome is stored at an address (relative to the start of the chunk) of
+        `516 + x * 2`. Each biome is two bytes: a UINT8 representing the type, and a single representing any metadata
+        (could be any format)
     Chunk flags:
         The chunk flags are an 64-bit bitmask that contains boolean information about the chunk.
             0x1 -- Whether skylight has been calculated yet
@@ -478,15 +1748,20 @@ class WorldChunk:
         The lighting data for each block is stored at an address (relative to the start of the chunk) of
         `548 + x * 16 + y`. Each block is represented by one byte, which is used to store two nibbles. The lower 4 bits
         of the byte represent the skylight, and the upper 4 bits represent the blocklight.
+    Array views:
+        The `get_*_view` methods return NumPy arrays that share memory with the chunk data, indexed as `[x, y]` (or
+        `[x]` for biomes). Writes to them go straight to the chunk data, but aren't tracked, so mark_dirty needs to be
+        called afterwards for them to be saved.
     """
 
+    __slots__ = ('section', 'x', 'y', 'abs_x', 'abs_y', 'address', 'fp', '_version', 'load_counter')
     section: Optional[WorldSection]
     x: int
     y: int
     abs_x: int
     abs_y: int
     address: int
-    fp: Union[bytearray, mmap]
+    fp: Union[bytearray, memoryview]
     _version: Optional[int]
     load_counter: int
 
@@ -497,21 +1772,19 @@ class WorldChunk:
         self.y = y
         self.abs_x = x + (section.x << 4)
         self.abs_y = y + (section.y << 4)
-        self.address = section._get_chunk_address(x, y)
-        if self.address == 298 and not section.is_chunk_present(x, y):
-            self.address = section.fp.size()
-            byte_address = (self.address - 298) >> 10
-            section.fp[section._get_chunk_base_address(x, y)] = byte_address
-            section._mark_chunk_present(x, y)
-            section.fp.flush()
-            section.fp.resize(section.fp.size() + 1024)
-            section.fp.flush()
-        self.fp = section.fp
+        self.address = 0
+        self.fp = section.get_chunk_data(x, y)
         self._version = None
         self.load_counter = 0
 
     @classmethod
-    def virtual_chunk(cls, x: int, y: int, abs_x: int, abs_y: int, data: ByteString) -> Self:
+    def virtual_chunk(
+        cls, x: int, y: int, abs_x: int, abs_y: int, data: ByteString, read_only: bool = False
+    ) -> Self:
+        """
+        Creates a chunk that isn't part of a section, so it's never saved. If `read_only` is True, the chunk shares
+        `data` without copying it, and writing to it raises an error.
+        """
         self = cls.__new__(cls)
         self.section = None
         self.x = x
@@ -519,7 +1792,10 @@ class WorldChunk:
         self.abs_x = abs_x
         self.abs_y = abs_y
         self.address = 0
-        self.fp = data if isinstance(data, bytearray) else bytearray(data) # Copy if necessary, otherwise don't
+        if read_only:
+            self.fp = memoryview(data).toreadonly()
+        else:
+            self.fp = data if isinstance(data, bytearray) else bytearray(data) # Copy if necessary, otherwise don't
         self._version = None
         self.load_counter = 0
         return self
@@ -541,17 +1817,26 @@ class WorldChunk:
         addr = self._get_tile_address(x, y)
         return get_block_by_id(self.fp[addr])
 
+    def get_tile_id(self, x: int, y: int) -> int:
+        return self.fp[self._get_tile_address(x, y)]
+
+    def mark_dirty(self) -> None:
+        if self.section is not None:
+            self.section.mark_chunk_dirty(self.x, self.y)
+
     def set_tile_type(self, x: int, y: int, type: Block) -> None:
         type.on_place(self, x, y)
         addr = self._get_tile_address(x, y)
         self.fp[addr] = type.id
+        self.mark_dirty()
 
     def set_tile_type_no_event(self, x: int, y: int, type: Block) -> None:
         addr = self._get_tile_address(x, y)
         self.fp[addr] = type.id
+        self.mark_dirty()
 
     def _get_biome_address(self, x: int, y: int) -> int:
-        return self.address + 516 + (x * 16 + y) * 2
+        return self.address + 516 + x * 2
 
     def get_biome_type(self, x: int, y: int) -> 'BiomeTypes':
         addr = self._get_biome_address(x, y)
@@ -560,12 +1845,14 @@ class WorldChunk:
     def set_biome_type(self, x: int, y: int, type: 'BiomeTypes') -> None:
         addr = self._get_biome_address(x, y)
         self.fp[addr] = type
+        self.mark_dirty()
 
     def get_flags(self) -> 'ChunkFlags':
         return ChunkFlags.from_bytes(self.fp[self.address + 548:self.address + 556], 'little', signed=False)
 
     def set_flags(self, flags: int) -> None:
         self.fp[self.address + 548:self.address + 556] = flags.to_bytes(8, 'little', signed=False)
+        self.mark_dirty()
 
     def _get_lighting_address(self, x: int, y: int) -> int:
         return self.address + 548 + x * 16 + y
@@ -575,6 +1862,7 @@ class WorldChunk:
 
     def set_packed_lighting(self, x: int, y: int, packed_lighting: int) -> None:
         self.fp[self._get_lighting_address(x, y)] = packed_lighting
+        self.mark_dirty()
 
     def get_skylight(self, x: int, y: int) -> int:
         return self.fp[self._get_lighting_address(x, y)] & 0xf
@@ -582,6 +1870,7 @@ class WorldChunk:
     def set_skylight(self, x: int, y: int, skylight: int) -> None:
         addr = self._get_lighting_address(x, y)
         self.fp[addr] = (self.fp[addr] & 0xf0) | skylight
+        self.mark_dirty()
 
     def get_blocklight(self, x: int, y: int) -> int:
         return self.fp[self._get_lighting_address(x, y)] >> 4
@@ -589,6 +1878,7 @@ class WorldChunk:
     def set_blocklight(self, x: int, y: int, blocklight: int) -> None:
         addr = self._get_lighting_address(x, y)
         self.fp[addr] = (self.fp[addr] & 0xf) | (blocklight << 4)
+        self.mark_dirty()
 
     def get_visual_light(self, x: int, y: int) -> int:
         packed = self.get_packed_lighting(x, y)
@@ -600,6 +1890,70 @@ class WorldChunk:
     def get_metadata_view(self) -> memoryview:
         return memoryview(self.fp)[self.address + 512:self.address + 1024]
 
+    def _get_array(self, offset: int, count: int) -> ChunkArray:
+        return np.frombuffer(self.fp, np.uint8, count, self.address + offset)
+
+    def get_tile_view(self) -> ChunkArray:
+        return self._get_array(0, 512).reshape(16, 16, 2)[:, :, 0]
+
+    def get_tile_metadata_view(self) -> ChunkArray:
+        return self._get_array(0, 512).reshape(16, 16, 2)[:, :, 1]
+
+    def get_biome_view(self) -> ChunkArray:
+        return self._get_array(516, 32).reshape(16, 2)[:, 0]
+
+    def get_lighting_view(self) -> ChunkArray:
+        return self._get_array(548, 256).reshape(16, 16)
+
+    def get_tile_ids(self) -> ChunkArray:
+        return self.get_tile_view().copy()
+
+    def set_tile_ids(self, ids: npt.ArrayLike) -> None:
+        self.get_tile_view()[:, :] = ids
+        self.mark_dirty()
+
+    def set_data(self, data: ByteString) -> None:
+        """Replaces all 1024 bytes of the chunk data, e.g. with data generated in another process."""
+        assert len(data) == 1024
+        self.fp[self.address:self.address + 1024] = data
+        self._version = None
+        self.mark_dirty()
+
+    def fill_tile_type(self, type: Block) -> None:
+        self.get_tile_view().fill(type.id)
+        self.mark_dirty()
+
+    def relight_blocks(self) -> None:
+        """
+        Recalculates the blocklight of the whole chunk in one pass. This is the same as calling Block.update_lighting
+        for every block, but it starts from the block luminescence rather than the old blocklight, so removed light
+        sources don't leave any light behind. Like the per-block updates, light doesn't spread to other chunks.
+        """
+        tiles = self.get_tile_view()
+        luminescence = blocks.BLOCK_LUMINESCENCE[tiles].astype(np.int16)
+        opacity = blocks.BLOCK_OPACITY[tiles].astype(np.int16)
+        blocklight = luminescence
+        for _ in range(32): # Light can't spread further than across the chunk
+            brightest = np.zeros_like(blocklight)
+            np.maximum(brightest[1:], blocklight[:-1], out=brightest[1:])
+            np.maximum(brightest[:-1], blocklight[1:], out=brightest[:-1])
+            np.maximum(brightest[:, 1:], blocklight[:, :-1], out=brightest[:, 1:])
+            np.maximum(brightest[:, :-1], blocklight[:, 1:], out=brightest[:, :-1])
+            new_blocklight = np.maximum(luminescence, brightest - opacity)
+            if np.array_equal(new_blocklight, blocklight):
+                break
+            blocklight = new_blocklight
+        lighting = self.get_lighting_view()
+        lighting[:, :] = (lighting & 0xf) | (np.clip(blocklight, 0, 15).astype(np.uint8) << 4)
+        self.mark_dirty()
+
+    def get_packed_lighting_array(self) -> ChunkArray:
+        return self.get_lighting_view().copy()
+
+    def set_packed_lighting_array(self, packed_lighting: npt.ArrayLike) -> None:
+        self.get_lighting_view()[:, :] = packed_lighting
+        self.mark_dirty()
+
     @property
     def version(self) -> int:
         if self._version is None:
@@ -615,6 +1969,7 @@ class WorldChunk:
         self.fp[self.address + 512:self.address + 516] = (
             version.to_bytes(4, 'little', signed=False)
         )
+        self.mark_dirty()
 
     @property
     def has_generated(self) -> bool:
@@ -624,33 +1979,31 @@ class WorldChunk:
 class OfflinePlayer(AbstractPlayer):
     name: Optional[str]
     uuid: UUID
-    data_path: Path
     world: World
     banned: Optional[Text]
     operator_level: int
     aloop: AbstractEventLoop
+    stored: bool
+    _saved_data: Optional[PlayerData]
 
     def __init__(self, name: Optional[str], uuid: UUID, world: 'World') -> None:
         self.name = name
         self.uuid = uuid
         self.world = world
-        self.data_path = world.players_path / f'{uuid}.json'
-        if uuid is not None and uuid.int == 0:
-            old_path = world.players_path / '00000000-0000-0000-0000-000000005db0.json'
-            if old_path.exists():
-                logging.info('Player used old save filename, renaming...')
-                old_path.rename(self.data_path) # Rename singleplayer saves
         self.loaded_chunks = {}
+        self.stored = False
+        self._saved_data = None
 
     async def ainit(self) -> None:
         self.aloop = asyncio.get_running_loop()
         if self.name is not None:
-            if (old_name := self.world._players_by_uuid.pop(self.uuid, None)) is not None:
-                self.world._players_by_name.pop(old_name, None)
-            if (old_uuid := self.world._players_by_name.pop(self.name, None)) is not None:
-                self.world._players_by_uuid.pop(old_uuid, None)
-            self.world._players_by_name[self.name] = self.uuid
-            self.world._players_by_uuid[self.uuid] = self.name
+            await self.world.player_store.set_name(self.name, self.uuid)
+        cached = self.world.get_cached_player(self.uuid)
+        if cached is not None and cached is not self:
+            # Saves write through the cache, so the cached record is at least as new as the stored one
+            self._copy_record_from(cached)
+            self.world.cache_player(self)
+            return
         spawn_x = self.world.meta['spawn_x']
         spawn_x = 0 if spawn_x is None else spawn_x
         spawn_y = self.world.meta['spawn_y']
@@ -658,21 +2011,15 @@ class OfflinePlayer(AbstractPlayer):
         banned = None
         operator_level = 0
         inventory = None
-        if self.data_path.exists():
-            async with aiofiles.open(self.data_path) as fp:
-                raw_data = await fp.read()
-            try:
-                data: dict[str, Any] = await self.aloop.run_in_executor(None, json.loads, raw_data)
-            except json.JSONDecodeError:
-                pass
-            else:
-                self.x = data.get('x', spawn_x)
-                self.y = data.get('y', spawn_y)
-                banned = data.get('banned', None)
-                if banned is not None:
-                    banned = Text.from_json(banned)
-                operator_level = data.get('operator', 0)
-                inventory = data.get('inventory', None)
+        data = await self.world.player_store.load(self.uuid)
+        if data is not None:
+            self.x = data.get('x', spawn_x)
+            self.y = data.get('y', spawn_y)
+            banned = data.get('banned', None)
+            if banned is not None:
+                banned = Text.from_json(banned)
+            operator_level = data.get('operator', 0)
+            inventory = data.get('inventory', None)
         else:
             self.x = spawn_x
             self.y = spawn_y
@@ -682,18 +2029,55 @@ class OfflinePlayer(AbstractPlayer):
             self.inventory = PlayerInventory.from_json(inventory)
         else:
             self.inventory = PlayerInventory()
-
-    async def save(self) -> None:
-        data = {
+        # Normalize the loaded (or default) data, so that it only counts as changed once something actually changes
+        self._saved_data = self.get_save_data()
+        self.stored = data is not None
+        if self.stored:
+            # Players that aren't in the player store are only cached once they're saved, so that looking up an unknown
+            # player doesn't create a record for them
+            self.world.cache_player(self)
+
+    def _copy_record_from(self, other: 'OfflinePlayer') -> None:
+        self.x = other.x
+        self.y = other.y
+        self.banned = other.banned
+        self.operator_level = other.operator_level
+        self.inventory = PlayerInventory.from_json(other.inventory.to_json())
+        self.stored = other.stored
+        self._saved_data = other._saved_data
+
+    def copy_record(self) -> 'OfflinePlayer':
+        """Returns a plain OfflinePlayer with a copy of this player's saved data."""
+        player = OfflinePlayer(self.name, self.uuid, self.world)
+        player.aloop = self.aloop
+        player._copy_record_from(self)
+        return player
+
+    def get_save_data(self) -> PlayerData:
+        return {
             'x': self.x,
             'y': self.y,
             'banned': None if not self.banned else self.banned.to_json(),
             'operator': self.operator_level,
             'inventory': self.inventory.to_json(),
         }
-        raw_data = await self.aloop.run_in_executor(None, partial(json.dumps, data, indent=2))
-        async with aiofiles.open(self.data_path, 'w') as fp:
-            await fp.write(raw_data)
+
+    def is_dirty(self) -> bool:
+        """Returns whether this player changed since it was loaded or last saved."""
+        return self.get_save_data() != self._saved_data
+
+    async def save(self) -> None:
+        data = self.get_save_data()
+        await self.world.player_store.save(self.uuid, data)
+        self.stored = True
+        self._saved_data = data
+        self.world.cache_player(self)
+
+    async def save_if_dirty(self) -> bool:
+        if not self.is_dirty():
+            return False
+        await self.save()
+        return True
 
     def __str__(self) -> str:
         return self.name or repr(self)
@@ -711,6 +2095,13 @@ DEFAULT_META: WorldMeta = {
 }
 
 
+def _copy_meta(meta: WorldMeta) -> WorldMeta:
+    # The player cache is the only field that isn't a plain value
+    meta = meta.copy()
+    meta['player_cache'] = meta['player_cache'].copy()
+    return meta
+
+
 class BiomeTypes(enum.IntEnum):
     HILLS = 0
 
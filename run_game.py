@@ -106,6 +106,15 @@ if not has_humanize:
     missing_deps_text += ' - Humanizer (humanize)\n'
     missing_deps.append('humanize')
 
+has_numpy = True
+try:
+    import numpy
+except ModuleNotFoundError:
+    has_numpy = False
+if not has_numpy:
+    missing_deps_text += ' - NumPy (numpy)\n'
+    missing_deps.append('numpy')
+
 has_typing_extensions_410 = True
 try:
     from typing_extensions import Never, Self
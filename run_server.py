@@ -75,6 +75,15 @@ if not has_humanize:
     missing_deps_text += ' - Humanizer (humanize)\n'
     missing_deps.append('humanize')
 
+has_numpy = True
+try:
+    import numpy
+except ModuleNotFoundError:
+    has_numpy = False
+if not has_numpy:
+    missing_deps_text += ' - NumPy (numpy)\n'
+    missing_deps.append('numpy')
+
 has_typing_extensions_410 = True
 try:
     from typing_extensions import Never, Self
@@ -119,5 +128,6 @@ if GAME_DIR.is_file() and os.path.splitext(GAME_DIR)[1].lower() == '.pyz':
             print('Extracted:', files_list)
     sys.path.insert(0, '.rundir')
 
-from and_beyond.server.main import main
-main()
+if __name__ == '__main__': # Worker processes re-import this file on some platforms
+    from and_beyond.server.main import main
+    main()
@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+
+from and_beyond.server.world_gen.core import WorldGenerator
+from and_beyond.server.world_gen.pool import ChunkGenerationPool
+from and_beyond.world import CHUNK_VERSION, WorldChunk
+
+SEED = 1632267049575376200
+
+
+def _generate_here(x: int, y: int) -> bytes:
+    chunk = WorldChunk.virtual_chunk(x & 15, y & 15, x, y, bytearray(1024))
+    WorldGenerator(SEED).generate_chunk(chunk)
+    chunk.version = CHUNK_VERSION
+    return bytes(chunk.fp)
+
+
+class ChunkGenerationPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def test_matches_in_process_generation(self) -> None:
+        pool = ChunkGenerationPool(SEED, 2)
+        try:
+            positions = [(x, y) for x in (-1, 0, 5) for y in range(-2, 3)]
+            futures = [pool.generate(x, y) for (x, y) in positions]
+            # Requests for a chunk that's already being generated share its result
+            self.assertIs(pool.generate(*positions[0]), futures[0])
+            results = await asyncio.wait_for(asyncio.gather(*futures), 60)
+        finally:
+            pool.close()
+        for ((x, y), data) in zip(positions, results):
+            self.assertEqual(data, _generate_here(x, y), (x, y))
+        self.assertEqual(pool.generated_count, len(positions))
+        self.assertEqual(pool.shared_count, 1)
+        self.assertEqual(pool.queue_depth, 0)
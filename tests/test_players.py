@@ -0,0 +1,40 @@
+import uuid
+
+from and_beyond.player_store import SqlitePlayerStore
+from and_beyond.world import OfflinePlayer
+from tests.test_world import WorldTestCase
+
+
+class PlayerStoreTest(WorldTestCase):
+    async def test_migrate_json_players(self) -> None:
+        world = await self.open_world()
+        player = OfflinePlayer('bob', uuid.UUID(int=5), world)
+        await player.ainit()
+        player.x = 12.5
+        player.operator_level = 2
+        await player.save()
+        await world.close()
+
+        world = await self.open_world(sqlite_players=True)
+        self.assertIsInstance(world.player_store, SqlitePlayerStore)
+        player = await world.get_player_by_name('bob')
+        self.assertEqual((player.uuid, player.x, player.operator_level), (uuid.UUID(int=5), 12.5, 2))
+        await world.close()
+
+        # Worlds with a player database keep using it
+        world = await self.open_world()
+        self.assertIsInstance(world.player_store, SqlitePlayerStore)
+        self.assertEqual(await world.player_store.get_name(uuid.UUID(int=5)), 'bob')
+        await world.close()
+
+    async def test_unknown_player_isnt_saved(self) -> None:
+        world = await self.open_world()
+        player = await world.get_player_by_uuid(uuid.UUID(int=7))
+        self.assertFalse(player.stored)
+        self.assertFalse(player.is_dirty())
+        self.assertNotIn(player.uuid, world.player_cache)
+        player.operator_level = 1
+        self.assertTrue(player.is_dirty())
+        await player.save()
+        self.assertIs(world.get_cached_player(player.uuid), player)
+        await world.close()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from and_beyond.server.world_gen.core import WorldGenerator
+from and_beyond.world import CHUNK_VERSION, DATA_VERSION, World, WorldChunk
+
+
+def _make_chunk_data(seed: int) -> bytearray:
+    chunk = WorldChunk.virtual_chunk(0, 0, 0, 0, bytearray(1024))
+    rng = np.random.default_rng(seed)
+    tiles = chunk.get_tile_view()
+    tiles[:, :8] = rng.integers(1, 8, (16, 8))
+    chunk.version = CHUNK_VERSION
+    return chunk.fp
+
+
+def _write_v2_section(path: str, chunks: dict[tuple[int, int], bytes]) -> None:
+    """Writes a section in the version 2 format (see the WorldSection docstring)."""
+    header = bytearray(298)
+    header[:10] = b'BEYOND' + (2).to_bytes(4, 'little', signed=False)
+    for (idx, (x, y)) in enumerate(chunks):
+        bit = x * 16 + y
+        header[10 + (bit >> 3)] |= 1 << (bit & 7)
+        header[42 + bit] = idx
+    with open(path, 'wb') as fp:
+        fp.write(header)
+        for data in chunks.values():
+            fp.write(data)
+
+
+class WorldTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        # Worlds are always stored relative to the working directory
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    async def open_world(self, **kwargs) -> World:
+        world = World('test', **kwargs)
+        await world.ainit(False)
+        return world
+
+
+class SectionFormatTest(WorldTestCase):
+    async def test_upgrade_v2_world(self) -> None:
+        world = await self.open_world()
+        chunks = {
+            (0, 15): bytes(_make_chunk_data(0)),
+            (3, 4): bytes(_make_chunk_data(1)),
+            (15, 0): bytes(1024), # Uniform
+        }
+        _write_v2_section(str(world.get_section_path(0, 0)), chunks)
+        await world.close()
+
+        world = await self.open_world()
+        await world.rebuild_manifest()
+        self.assertEqual(world.manifest[(0, 0)]['version'], 2)
+        optimized, errors = await world.optimize_sections(1)
+        self.assertEqual((optimized, errors), (1, 0))
+        self.assertEqual(world.manifest[(0, 0)]['version'], DATA_VERSION)
+        for ((x, y), data) in chunks.items():
+            self.assertEqual(bytes(world.get_chunk(x, y).fp), data)
+        self.assertIsNone(world.peek_chunk(1, 1))
+        # The heightmap is calculated during the upgrade
+        tiles = np.frombuffer(chunks[(0, 15)], np.uint8, 512).reshape(16, 16, 2)[:, :, 0]
+        self.assertEqual(world.get_surface_height(0), 15 * 16 + int(np.flatnonzero(tiles[0]).max()))
+        await world.close()
+
+        world = await self.open_world()
+        self.assertEqual(world.manifest[(0, 0)]['version'], DATA_VERSION)
+        for ((x, y), data) in chunks.items():
+            self.assertEqual(bytes(world.get_chunk(x, y).fp), data)
+        await world.close()
+
+    async def test_reopen_current_world(self) -> None:
+        world = await self.open_world()
+        gen = WorldGenerator(world.meta['seed'])
+        ids = np.random.default_rng(2).integers(0, 8, (40, 24), np.uint8)
+        world.write_region(-10, 30, ids, gen)
+        region = world.read_region(-20, 20, 60, 40)
+        await world.close()
+
+        world = await self.open_world()
+        self.assertTrue(all(info['version'] == DATA_VERSION for info in world.manifest.values()))
+        np.testing.assert_array_equal(world.read_region(-10, 30, 40, 24), ids)
+        np.testing.assert_array_equal(world.read_region(-20, 20, 60, 40), region)
+        self.assertTrue(world.get_chunk(0, 3).has_generated)
+        await world.close()
+
+
+class SectionEvictionTest(WorldTestCase):
+    async def test_write_across_section_boundary(self) -> None:
+        world = await self.open_world(max_open_sections=1)
+        gen = WorldGenerator(world.meta['seed'])
+        # x=250..261 spans sections 0 and 1
+        ids = np.full((12, 4), 3, np.uint8)
+        world.write_region(250, 100, ids, gen)
+        np.testing.assert_array_equal(world.read_region(250, 100, 12, 4), ids)
+        await world.flush_sections()
+        self.assertEqual(world.evict_sections(), 1)
+        self.assertEqual(len(world.open_sections), 1)
+        np.testing.assert_array_equal(world.read_region(250, 100, 12, 4), ids)
+        await world.close()
+
+        world = await self.open_world()
+        np.testing.assert_array_equal(world.read_region(250, 100, 12, 4), ids)
+        await world.close()
+
+    async def test_loaded_chunks_pin_sections(self) -> None:
+        world = await self.open_world(max_open_sections=0)
+        chunk = world.get_chunk(0, 0)
+        chunk.mark_loaded()
+        world.get_chunk(16, 0)
+        await world.flush_sections()
+        self.assertEqual(world.evict_sections(), 1)
+        self.assertEqual(list(world.open_sections), [(0, 0)])
+        await world.close()